@@ -1,12 +1,243 @@
 # app/api/repositories/_utils.py
-from typing import Iterable, List
+import json
+import re
+from datetime import datetime
+from functools import lru_cache
+from typing import Iterable, List, Optional, Sequence
 from fastapi import HTTPException
-from sqlalchemy import select, inspect
+from sqlalchemy import (
+    DateTime,
+    Integer,
+    Select,
+    String,
+    bindparam,
+    column,
+    delete,
+    func,
+    insert,
+    inspect,
+    literal,
+    literal_column,
+    or_,
+    select,
+    tuple_,
+    update,
+    values,
+)
+from sqlalchemy.types import TypeDecorator
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import lazyload, noload, with_expression
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.util import identity_key
+from sqlalchemy.sql.functions import FunctionElement
 
+from app.schemas.models.collections_models import Collection
 from app.schemas.models.tags_models import Tag
 
 
+class _cursor_ts(FunctionElement):
+    """Timestamp expression that compares the same way as it sorts.
+
+    SQLite keeps DateTime columns as text, so `CURRENT_TIMESTAMP` rows and
+    bound Python datetimes differ in precision; `datetime()` normalises both.
+    Every other dialect compares native timestamps and renders the bare value.
+    """
+    type = DateTime(timezone=True)
+    name = "cursor_ts"
+    inherit_cache = True
+
+
+@compiles(_cursor_ts)
+def _compile_cursor_ts(element, compiler, **kw):
+    return compiler.process(element.clauses, **kw)
+
+
+@compiles(_cursor_ts, "sqlite")
+def _compile_cursor_ts_sqlite(element, compiler, **kw):
+    return "datetime(%s)" % compiler.process(element.clauses, **kw)
+
+
+class _IdList(TypeDecorator):
+    """Integer list from `array_agg` (Postgres) or `json_group_array` (SQLite)."""
+    impl = String
+    cache_ok = True
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return []
+        if isinstance(value, str):
+            value = json.loads(value)
+        return sorted(v for v in value if v is not None)
+
+
+class _id_list_agg(FunctionElement):
+    type = _IdList()
+    name = "id_list_agg"
+    inherit_cache = True
+
+
+@compiles(_id_list_agg)
+def _compile_id_list_agg(element, compiler, **kw):
+    return "array_agg(%s)" % compiler.process(element.clauses, **kw)
+
+
+@compiles(_id_list_agg, "sqlite")
+def _compile_id_list_agg_sqlite(element, compiler, **kw):
+    return "json_group_array(%s)" % compiler.process(element.clauses, **kw)
+
+
+def _with_tag_ids(model) -> tuple:
+    """Loader options that fill `model.tag_id_list` from the main query.
+
+    A correlated aggregate over the association table returns just the tag
+    IDs, so list/search responses skip the `selectinload(tags)` round-trip
+    and never hydrate Tag rows. `tags` is left unloaded (not emptied), so a
+    later detail load in the same session still fetches it normally.
+    """
+    table, owner_col, tag_col = _association(model)
+    ids = (
+        select(_id_list_agg(tag_col))
+        .where(owner_col == model.id)
+        .correlate(model)
+        .scalar_subquery()
+    )
+    return lazyload(model.tags), with_expression(model.tag_id_list, ids)
+
+
+def _paginate(
+    stmt: Select,
+    model,
+    skip: int | None = None,
+    limit: int | None = None,
+    after_updated_at: Optional[datetime] = None,
+    after_id: Optional[int] = None,
+) -> Select:
+    """Order newest-first and apply LIMIT plus OFFSET or keyset pagination.
+
+    When both ``after_updated_at`` and ``after_id`` are given, rows are seeked
+    past that cursor with ``(updated_at, id) < (:u, :i)`` instead of OFFSET, so
+    the cost stays O(limit) no matter how deep the page is.
+    """
+    updated_at = _cursor_ts(model.updated_at)
+    stmt = stmt.order_by(updated_at.desc(), model.id.desc())
+    if after_updated_at is not None and after_id is not None:
+        stmt = stmt.where(
+            tuple_(updated_at, model.id)
+            < tuple_(_cursor_ts(after_updated_at), after_id)
+        )
+    elif skip:
+        stmt = stmt.offset(skip)
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    return stmt
+
+
+# Rows fetched per round-trip when streaming listings through a server-side cursor
+_STREAM_YIELD_PER = 200
+
+
+# Search counts stop here; anything above is reported as "more than" the cap
+_SEARCH_COUNT_CAP = 1000
+
+
+def _bounded_count_stmt(stmt: Select) -> Select:
+    """`SELECT count(*)` over at most `_SEARCH_COUNT_CAP + 1` rows of `stmt`."""
+    probe = stmt.with_only_columns(literal(1)).order_by(None).limit(_SEARCH_COUNT_CAP + 1)
+    return select(func.count()).select_from(probe.subquery())
+
+
+def _capped(total: int) -> tuple[int, bool]:
+    if total > _SEARCH_COUNT_CAP:
+        return _SEARCH_COUNT_CAP, False
+    return total, True
+
+
+async def _bounded_count(session: AsyncSession, stmt: Select) -> tuple[int, bool]:
+    """Count rows of `stmt` without scanning past `_SEARCH_COUNT_CAP + 1` matches.
+
+    Returns `(count, exact)`; when more than the cap match, `count` is the cap
+    and `exact` is False. A full `count(*)` over an infix ILIKE costs as much
+    as the search itself, so it is never run unbounded.
+    """
+    return _capped(await session.scalar(_bounded_count_stmt(stmt)))
+
+
+async def _first_page_with_count(
+    session: AsyncSession, stmt: Select, model, limit: int, *options
+) -> tuple[list, tuple[int, bool]]:
+    """First `limit` rows of `stmt`, newest first, plus its `_bounded_count`.
+
+    Rows are loaded with `options`. The count rides along as an uncorrelated
+    scalar subquery in the page's column list, so both come back in one
+    round-trip (the database evaluates it once). An empty first page means
+    nothing matched at all.
+    """
+    count = _bounded_count_stmt(stmt).scalar_subquery()
+    page = _paginate(stmt.options(*options), model, 0, limit).add_columns(count)
+    rows = (await session.execute(page)).all()
+    return [row[0] for row in rows], _capped(rows[0][1] if rows else 0)
+
+
+# Above this many IDs, Postgres gets a VALUES-list join instead of `IN (...)`
+_VALUES_JOIN_THRESHOLD = 50
+
+
+def _dialect_name(session: AsyncSession) -> str:
+    return session.bind.dialect.name
+
+
+# Inlined, not bound, so the query expression matches the GIN expression indexes
+_TS_CONFIG = literal_column("'simple'")
+_TS_EMPTY = literal_column("''")
+_TS_SPACE = literal_column("' '")
+_TS_WORD = re.compile(r"[^\W_]+")
+
+
+def _text_search(session: AsyncSession, columns: Sequence, query: str):
+    """
+    WHERE clause matching `query` against `columns`.
+
+    On PostgreSQL this is full-text search over
+    `to_tsvector('simple', coalesce(col, '') || ' ' || ...)`, every word of the
+    query matched as a prefix, so it is served by the GIN indexes from migrations
+    a3c9e1f7b2d5 and b5d2e8f1c9a4. Note the semantics differ by dialect: on
+    PostgreSQL matching is per word prefix ("rep" finds "report", "ask" does
+    not find "task"), while other dialects (and queries without any word
+    characters) fall back to a case-insensitive infix ILIKE on each column.
+    No index serves that ILIKE; the trigram indexes went with the FTS switch.
+    """
+    words = _TS_WORD.findall(query)
+    if words and _dialect_name(session) == "postgresql":
+        document = func.coalesce(columns[0], _TS_EMPTY)
+        for col in columns[1:]:
+            document = document.op("||")(_TS_SPACE).op("||")(func.coalesce(col, _TS_EMPTY))
+        tsquery = func.to_tsquery(_TS_CONFIG, " & ".join(f"{w}:*" for w in words))
+        return func.to_tsvector(_TS_CONFIG, document).op("@@")(tsquery)
+
+    search_term = f"%{query}%"
+    return or_(*(col.ilike(search_term) for col in columns))
+
+
+def _select_tags_by_ids(
+    session: AsyncSession, user_id: int, tag_ids: Iterable[int]
+) -> Select:
+    """Build the user-scoped `SELECT ... FROM tags` for a list of IDs.
+
+    Small lists use `IN (...)`. Large lists on Postgres join a derived VALUES
+    relation instead, which the planner can hash/merge join and which avoids
+    the per-dialect limits on IN-list size.
+    """
+    stmt = select(Tag).where(Tag.user_id == user_id)
+    ids = tag_ids if isinstance(tag_ids, (set, frozenset)) else set(tag_ids)
+    if len(ids) > _VALUES_JOIN_THRESHOLD and _dialect_name(session) == "postgresql":
+        vals = values(column("id", Integer), name="t").data([(i,) for i in ids])
+        return stmt.join(vals, Tag.id == vals.c.id)
+    return stmt.where(Tag.id.in_(ids))
+
+
 async def _load_tags(
     session: AsyncSession,
     user_id: int,
@@ -14,17 +245,14 @@ async def _load_tags(
     require_all: bool = True,
 ) -> List[Tag]:
     """Load Tag rows for a user by IDs. Optionally enforce that all IDs exist."""
-    ids = list(dict.fromkeys(tag_ids))  # dedupe, preserve order
+    ids = set(tag_ids)  # M2M collections are unordered; no need to keep input order
     if not ids:
         return []
-    res = await session.execute(
-        select(Tag).where(Tag.user_id == user_id, Tag.id.in_(ids))
-    )
+    res = await session.execute(_select_tags_by_ids(session, user_id, ids))
     tags = list(res.scalars().all())
 
-    if require_all and len(tags) != len(set(ids)):
-        found = {t.id for t in tags}
-        missing = sorted(set(ids) - found)
+    if require_all and len(tags) != len(ids):
+        missing = sorted(ids.difference(t.id for t in tags))
         raise HTTPException(
             status_code=400,
             detail=f"Tags not found or not owned by user: {missing}",
@@ -32,7 +260,204 @@ async def _load_tags(
     return tags
 
 
+async def _update_returning(session: AsyncSession, obj, update_data: dict, *criteria):
+    """Apply `update_data` to a user-owned row with one `UPDATE ... RETURNING`.
+
+    The returned column values (including the server-side `updated_at`) are
+    written onto `obj` as committed state, so callers need no follow-up
+    SELECT and relationships such as `tags` are left untouched. Extra
+    `criteria` are ANDed into the WHERE clause; None is returned when they
+    leave no row to update.
+    """
+    if not update_data:
+        return obj
+    model = type(obj)
+    attrs = inspect(model).column_attrs
+    stmt = (
+        update(model.__table__)
+        .where(model.id == obj.id, model.user_id == obj.user_id, *criteria)
+        .values(**update_data)
+        .returning(*(attr.columns[0] for attr in attrs))
+    )
+    row = (await session.execute(stmt)).one_or_none()
+    if row is None:
+        return None
+    for attr, value in zip(attrs, row):
+        set_committed_value(obj, attr.key, value)
+    return obj
+
+
+async def _delete_owned(session: AsyncSession, model, obj_id: int, user_id: int) -> bool:
+    """Delete a user-owned row and its tag links without loading it first.
+
+    The association rows go first (their foreign keys have no ON DELETE
+    CASCADE), then `DELETE ... RETURNING id` both removes the row and tells
+    whether it existed and was the user's. Returns False when nothing matched.
+    """
+    table, owner_col, _ = _association(model)
+    owned = (model.id == obj_id, model.user_id == user_id)
+    await session.execute(
+        delete(table).where(owner_col.in_(select(model.id).where(*owned)))
+    )
+    result = await session.execute(delete(model.__table__).where(*owned).returning(model.id))
+    if result.scalar_one_or_none() is None:
+        return False
+    stale = session.sync_session.identity_map.get(identity_key(model, obj_id))
+    if stale is not None:
+        session.expunge(stale)
+    return True
+
+
+def _tag_cache(session: AsyncSession) -> dict:
+    """Per-session `(table, id) -> [Tag]` memo; sessions are request-scoped."""
+    return session.info.setdefault("tag_cache", {})
+
+
+def _remember_tags(session: AsyncSession, obj) -> None:
+    _tag_cache(session)[(obj.__tablename__, obj.id)] = list(obj.tags)
+
+
+@lru_cache(maxsize=None)
+def _owned_by_id_stmt(model, with_tags: bool = True) -> Select:
+    """`SELECT model WHERE id = :obj_id AND user_id = :user_id`, built once per model.
+
+    Reusing one statement object keeps SQLAlchemy's compiled-cache lookup
+    trivial and lets asyncpg reuse its prepared statement. Without
+    `with_tags` the tags relationship is not loaded at all.
+    """
+    stmt = select(model).where(
+        model.id == bindparam("obj_id"), model.user_id == bindparam("user_id")
+    )
+    if not with_tags and hasattr(model, "tags"):
+        stmt = stmt.options(noload(model.tags))
+    return stmt
+
+
+# Projected ownership + type check used before attaching a task/note to a collection
+_COLLECTION_TYPE_BY_ID_AND_USER = select(Collection.type).where(
+    Collection.id == bindparam("obj_id"), Collection.user_id == bindparam("user_id")
+)
+
+
+@lru_cache(maxsize=None)
+def _owned_tags_stmt(model) -> Select:
+    """The user's tags linked to `model` row `:obj_id`, via the association table only.
+
+    Unlike `selectinload(model.tags)`, which joins back to the parent table,
+    this only touches the association and `tags`. The Tag rows are loaded
+    whole: they land in the identity map and the per-request tag memo, where
+    any later reader (a TagOut, `_replace_tags`) may need every column.
+    """
+    table, owner_col, tag_col = _association(model)
+    return (
+        select(Tag)
+        .join(table, tag_col == Tag.id)
+        .where(owner_col == bindparam("obj_id"), Tag.user_id == bindparam("user_id"))
+    )
+
+
+async def _get_owned_with_tags(session: AsyncSession, model, obj_id: int, user_id: int):
+    """Fetch one of the user's `model` rows with its tags.
+
+    The first lookup in a request loads the tags (restricted to the user's
+    own tags) and memoises them; later lookups of the same row reuse that
+    list instead of issuing the second SELECT again.
+    """
+    params = {"obj_id": obj_id, "user_id": user_id}
+    result = await session.execute(_owned_by_id_stmt(model, with_tags=False), params)
+    obj = result.scalar_one_or_none()
+    if obj is None:
+        return None
+
+    cached = _tag_cache(session).get((model.__tablename__, obj_id))
+    if cached is not None:
+        set_committed_value(obj, "tags", list(cached))
+        return obj
+
+    tags = await session.execute(_owned_tags_stmt(model), params)
+    set_committed_value(obj, "tags", list(tags.scalars()))
+    _remember_tags(session, obj)
+    return obj
+
+
 def _is_new_or_pending(obj) -> bool:
     st = inspect(obj)
     return st.transient or st.pending
 
+
+def _association(model):
+    """Return `(table, owner_column, tag_column)` behind `model.tags`."""
+    rel = model.tags.property
+    return (
+        rel.secondary,
+        rel.synchronize_pairs[0][1],
+        rel.secondary_synchronize_pairs[0][1],
+    )
+
+
+async def _replace_tags(session: AsyncSession, obj, tag_ids: Iterable[int]) -> None:
+    """Rewrite a persistent object's tag links without hydrating its old tags.
+
+    When `obj.tags` is already loaded (the owned-by-id read and freshly
+    created rows both leave it loaded), only the difference is written:
+    `DELETE` the dropped links and link the new ones, so resending the same
+    tags costs no statement at all. Otherwise every current link is deleted.
+    New links go through `INSERT ... SELECT` from the user's own tags with
+    `RETURNING`, so the ownership check and the write share one round-trip.
+    Tag objects for the in-memory collection come from the identity map,
+    falling back to one SELECT for any not yet loaded.
+    """
+    ids = set(tag_ids)
+    table, owner_col, tag_col = _association(type(obj))
+
+    if "tags" in inspect(obj).unloaded:
+        await session.execute(delete(table).where(owner_col == obj.id))
+        tags, added = [], ids
+    else:
+        current = {tag.id: tag for tag in obj.tags}
+        removed = current.keys() - ids
+        added = ids - current.keys()
+        tags = [current[tag_id] for tag_id in ids & current.keys()]
+        if removed:
+            await session.execute(
+                delete(table).where(owner_col == obj.id, tag_col.in_(removed))
+            )
+
+    if added:
+        owned = select(literal(obj.id), Tag.id).where(
+            Tag.user_id == obj.user_id, Tag.id.in_(added)
+        )
+        result = await session.execute(
+            insert(table)
+            .from_select([owner_col.name, tag_col.name], owned)
+            .returning(tag_col)
+        )
+        linked = set(result.scalars())
+        if len(linked) != len(added):
+            raise HTTPException(
+                status_code=400,
+                detail=f"Tags not found or not owned by user: {sorted(added - linked)}",
+            )
+
+        identity_map = session.sync_session.identity_map
+        unloaded = []
+        for tag_id in added:
+            tag = identity_map.get(identity_key(Tag, tag_id))
+            if tag is None:
+                unloaded.append(tag_id)
+            else:
+                tags.append(tag)
+        if unloaded:
+            result = await session.execute(select(Tag).where(Tag.id.in_(unloaded)))
+            tags.extend(result.scalars())
+
+    set_committed_value(obj, "tags", tags)
+
+
+def _insert_ignoring_duplicates(session: AsyncSession, table):
+    dialect = _dialect_name(session)
+    if dialect == "postgresql":
+        return pg_insert(table).on_conflict_do_nothing()
+    if dialect == "sqlite":
+        return sqlite_insert(table).on_conflict_do_nothing()
+    return insert(table)
@@ -1,10 +1,42 @@
 # app/api/repositories/auths_repositories.py
 
 from fastapi import Depends
+from sqlalchemy import bindparam, func, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.orm import undefer_group
+from sqlalchemy.orm.attributes import set_committed_value
+from app.api.repositories._utils import _insert_ignoring_duplicates
 from app.schemas.database import get_async_session
+from app.schemas.contracts.users_dtos import UserOut
 from app.schemas.models.users_models import User
+from app.utility.cache import cache_get, cache_set
+
+# Cached per user for the auth hot path: exactly the UserOut fields, so the
+# password hash is never cached. There is no profile update/delete route yet;
+# one must cache_delete(_user_cache_key(id)), until then the TTL bounds staleness.
+USER_CACHE_TTL = 60
+_CACHED_USER_FIELDS = tuple(UserOut.model_fields)
+
+
+# Built once so every login reuses the same compiled SQL (and asyncpg prepared statement)
+_USER_BY_USERNAME = (
+    select(User)
+    .where(func.lower(User.username) == func.lower(bindparam("username")))
+    .options(undefer_group("credentials"))
+)
+
+
+# Column-only lookup for authenticated requests: no ORM identity/unit-of-work work
+_USER_FIELDS_BY_ID = select(
+    *(getattr(User, field) for field in _CACHED_USER_FIELDS)
+).where(User.id == bindparam("user_id"))
+
+
+def _user_cache_key(user_id: int) -> str:
+    return f"user:{user_id}"
+
 
 class AuthRepository:
     def __init__(self, db: AsyncSession):
@@ -12,24 +44,60 @@ class AuthRepository:
 
     async def get_user_by_username_or_email(self, username: str, email: str) -> User | None:
         result = await self.db.execute(
-            select(User).where((User.username == username) | (User.email == email))
+            select(User).where(
+                (func.lower(User.username) == func.lower(username))
+                | (func.lower(User.email) == func.lower(email))
+            )
         )
         return result.scalar_one_or_none()
 
     async def get_user_by_username(self, username: str) -> User | None:
-        result = await self.db.execute(select(User).where(User.username == username))
+        result = await self.db.execute(_USER_BY_USERNAME, {"username": username})
         return result.scalar_one_or_none()
 
-    async def create_user(self, user_data: dict) -> User:
-        new_user = User(**user_data)
-        self.db.add(new_user)
+    async def create_user(self, user_data: dict) -> User | None:
+        """Insert a user in one round-trip; None if the username or email is taken."""
+        stmt = (
+            _insert_ignoring_duplicates(self.db, User)
+            .values(**user_data)
+            .returning(User)
+        )
+        try:
+            result = await self.db.execute(stmt)
+            new_user = result.scalar_one_or_none()
+        except IntegrityError:  # dialects without ON CONFLICT
+            new_user = None
+        if new_user is None:
+            await self.db.rollback()
+            return None
         await self.db.commit()
-        await self.db.refresh(new_user)
         return new_user
 
-    async def get_user_by_id(self, user_id: int) -> User | None:
-        result = await self.db.execute(select(User).where(User.id == user_id))
-        return result.scalar_one_or_none()
+    async def update_password_hash(self, user: User, password_hash: str) -> None:
+        await self.db.execute(
+            update(User).where(User.id == user.id).values(password_hash=password_hash)
+        )
+        await self.db.commit()
+        set_committed_value(user, "password_hash", password_hash)
+
+    async def get_user_by_id(self, user_id: int) -> UserOut | None:
+        """Read-through lookup of the user's public profile.
+
+        Returns a `UserOut` (not an ORM entity), whether served from the cache
+        or the DB, so callers can't mistake it for a session-bound User.
+        """
+        key = _user_cache_key(user_id)
+        cached = await cache_get(key)
+        if cached is not None:
+            return UserOut.model_validate(cached)
+
+        result = await self.db.execute(_USER_FIELDS_BY_ID, {"user_id": user_id})
+        row = result.mappings().one_or_none()
+        if row is None:
+            return None
+        user = UserOut.model_validate(dict(row))
+        await cache_set(key, user.model_dump(mode="json"), ttl=USER_CACHE_TTL)
+        return user
 
 # Dependency for easy injection
 def get_auth_repository(
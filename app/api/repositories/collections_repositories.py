@@ -1,73 +1,200 @@
-from typing import Iterable, Optional, Sequence
+import asyncio
+from datetime import datetime
+from typing import AsyncIterator, Iterable, Optional, Sequence
 
 from fastapi import Depends
-from sqlalchemy import select
+from sqlalchemy import Select, bindparam, delete, exists, select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import lazyload
+from sqlalchemy.orm.attributes import set_committed_value
 
-from app.api.repositories._utils import _is_new_or_pending, _load_tags
-from app.schemas.database import get_async_session
+from app.api.repositories._utils import (
+    _STREAM_YIELD_PER,
+    _association,
+    _bounded_count,
+    _first_page_with_count,
+    _delete_owned,
+    _dialect_name,
+    _get_owned_with_tags,
+    _insert_ignoring_duplicates,
+    _is_new_or_pending,
+    _load_tags,
+    _paginate,
+    _remember_tags,
+    _replace_tags,
+    _select_tags_by_ids,
+    _text_search,
+    _update_returning,
+    _with_tag_ids,
+)
+from app.schemas.database import AsyncLocalSession, get_async_session
 from app.schemas.models.collections_models import Collection
+from app.schemas.models.notes_models import Note
 from app.schemas.models.tags_models import Tag
+from app.schemas.models.tasks_models import Task
+
+_COLLECTION_BY_TITLE_AND_USER = select(Collection).where(
+    Collection.title == bindparam("title"), Collection.user_id == bindparam("user_id")
+)
+# Existence probe used to tell a missing row from a title clash after a no-op UPDATE
+_COLLECTION_EXISTS = select(
+    exists().where(
+        Collection.id == bindparam("collection_id"), Collection.user_id == bindparam("user_id")
+    )
+)
 
 
 class CollectionRepository:
     def __init__(self, db: AsyncSession):
         self.db = db
 
-    async def get_collections_by_user(
+    def _collections_by_user_stmt(
         self, user_id: int, type_filter: Optional[str] = None
-    ) -> Sequence[Collection]:
+    ) -> Select:
         stmt = (
             select(Collection)
             .where(Collection.user_id == user_id)
-            .options(selectinload(Collection.tags))
+            .options(*_with_tag_ids(Collection))
         )
         if type_filter:
             stmt = stmt.where(Collection.type == type_filter)
-        result = await self.db.execute(stmt)
+        return stmt
+
+    async def get_collections_by_user(
+        self, user_id: int, type_filter: Optional[str] = None
+    ) -> Sequence[Collection]:
+        result = await self.db.execute(self._collections_by_user_stmt(user_id, type_filter))
         return result.scalars().all()
 
+    async def stream_collections_by_user(
+        self, user_id: int, type_filter: Optional[str] = None
+    ) -> AsyncIterator[Collection]:
+        """Yield the user's collections in batches of `_STREAM_YIELD_PER` via a server-side cursor."""
+        stmt = self._collections_by_user_stmt(user_id, type_filter)
+        result = await self.db.stream_scalars(
+            stmt.execution_options(yield_per=_STREAM_YIELD_PER)
+        )
+        async for collection in result:
+            yield collection
+
     async def get_collection_by_id(self, collection_id: int) -> Collection | None:
         return await self.db.get(Collection, collection_id)
 
     async def get_collection_by_id_and_user(
         self, collection_id: int, user_id: int
     ) -> Collection | None:
-        result = await self.db.execute(
-            select(Collection)
-            .where(Collection.id == collection_id, Collection.user_id == user_id)
-            .options(selectinload(Collection.tags))
-        )
-        return result.scalar_one_or_none()
+        return await _get_owned_with_tags(self.db, Collection, collection_id, user_id)
 
     async def get_collection_by_title_and_user(
         self, title: str, user_id: int
     ) -> Collection | None:
         result = await self.db.execute(
-            select(Collection).where(Collection.title == title, Collection.user_id == user_id)
+            _COLLECTION_BY_TITLE_AND_USER, {"title": title, "user_id": user_id}
         )
         return result.scalar_one_or_none()
 
-    async def create_collection(self, collection_data: dict) -> Collection:
-        db_collection = Collection(**collection_data)
-        self.db.add(db_collection)
-        await self.db.flush()
-        return db_collection
+    async def create_collection_if_unique(self, collection_data: dict) -> Collection | None:
+        """Insert a collection in one round-trip; None if the user already has one with this title."""
+        stmt = (
+            _insert_ignoring_duplicates(self.db, Collection)
+            .values(**collection_data)
+            .returning(Collection)
+            .options(lazyload(Collection.tags))
+        )
+        try:
+            result = await self.db.execute(stmt)
+        except IntegrityError:  # dialects without ON CONFLICT
+            await self.db.rollback()
+            return None
+        new_collection = result.scalar_one_or_none()
+        if new_collection is not None:
+            set_committed_value(new_collection, "tags", [])  # a new row has no tags yet
+        return new_collection
+
+    async def collection_exists(self, collection_id: int, user_id: int) -> bool:
+        result = await self.db.execute(
+            _COLLECTION_EXISTS, {"collection_id": collection_id, "user_id": user_id}
+        )
+        return result.scalar()
+
+    async def update_collection_if_unique(
+        self, collection: Collection, update_data: dict
+    ) -> Collection | None:
+        """Apply `update_data` in one `UPDATE`; None if no row was updated.
+
+        That is either a title already taken by the user or a row deleted
+        since it was loaded; `collection_exists` tells the two apart.
+        """
+        criteria = []
+        title = update_data.get("title")
+        if title is not None and title != collection.title:
+            other = Collection.__table__.alias("other")
+            criteria.append(
+                ~exists().where(
+                    other.c.user_id == collection.user_id,
+                    other.c.title == title,
+                    other.c.id != collection.id,
+                )
+            )
+        try:
+            return await _update_returning(self.db, collection, update_data, *criteria)
+        except IntegrityError:  # lost a race against a concurrent rename
+            await self.db.rollback()
+            return None
 
-    async def update_collection(self, collection: Collection, update_data: dict) -> Collection:
-        for key, value in update_data.items():
-            setattr(collection, key, value)
-        await self.db.flush()
-        return collection
+    async def delete_collection_by_id_and_user(self, collection_id: int, user_id: int) -> bool:
+        """Delete the user's collection with its tasks, notes and every tag link in bulk.
 
-    async def delete_collection(self, collection: Collection) -> None:
-        await self.db.delete(collection)
-        await self.db.flush()
+        Going through the ORM cascade would load each child and, via the
+        child's tags, its links just to delete them row by row. Returns False
+        (deleting nothing) when the collection does not exist or is not theirs.
+        """
+        owned = select(Collection.id).where(
+            Collection.id == collection_id, Collection.user_id == user_id
+        )
+        for model in (Task, Note):
+            table, owner_col, _ = _association(model)
+            children = select(model.id).where(model.collection_id.in_(owned))
+            await self.db.execute(delete(table).where(owner_col.in_(children)))
+            await self.db.execute(
+                delete(model.__table__).where(model.collection_id.in_(owned))
+            )
+        return await _delete_owned(self.db, Collection, collection_id, user_id)
 
     async def preload_collection_items(self, collection: Collection) -> None:
-        # Only if you need tasks/notes in the same response
-        await self.db.refresh(collection, attribute_names=["tasks", "notes"])
+        """Load collection.tasks and collection.notes for a read-only response.
+
+        The two SELECTs are independent, so on server databases they run
+        concurrently on separate pooled sessions (an AsyncSession cannot run
+        two statements at once); the rows come back detached, which is fine
+        for serialization. SQLite has a single writer connection per file
+        anyway, so there they run one after the other on this session.
+        """
+        # Children only need tag IDs, aggregated in SQL rather than selectin-loading Tag rows
+        tasks_stmt = (
+            select(Task)
+            .where(Task.collection_id == collection.id)
+            .options(*_with_tag_ids(Task))
+        )
+        notes_stmt = (
+            select(Note)
+            .where(Note.collection_id == collection.id)
+            .options(*_with_tag_ids(Note))
+        )
+
+        if _dialect_name(self.db) == "sqlite":
+            tasks = (await self.db.execute(tasks_stmt)).scalars().all()
+            notes = (await self.db.execute(notes_stmt)).scalars().all()
+        else:
+            async def fetch(stmt):
+                async with AsyncLocalSession() as session:
+                    return (await session.execute(stmt)).scalars().all()
+
+            tasks, notes = await asyncio.gather(fetch(tasks_stmt), fetch(notes_stmt))
+
+        set_committed_value(collection, "tasks", list(tasks))
+        set_committed_value(collection, "notes", list(notes))
 
     async def get_tags_by_ids_and_user(
         self, tag_ids: list[int], user_id: int
@@ -75,22 +202,37 @@ class CollectionRepository:
         if not tag_ids:
             return []
         result = await self.db.execute(
-            select(Tag).where(Tag.user_id == user_id, Tag.id.in_(tag_ids))
+            _select_tags_by_ids(self.db, user_id, tag_ids)
         )
         return result.scalars().all()
 
     async def set_collection_tags(self, collection: Collection, tag_ids: Iterable[int]) -> None:
         """Replace collection.tags with given tag IDs (async-safe)."""
-        tags = await _load_tags(self.db, collection.user_id, tag_ids)
-
         if _is_new_or_pending(collection):
-            collection.tags = tags
+            collection.tags = await _load_tags(self.db, collection.user_id, tag_ids)
+            await self.db.flush()
         else:
-            await self.db.refresh(collection, attribute_names=["tags"])
-            collection.tags.clear()
-            collection.tags.extend(tags)
+            await _replace_tags(self.db, collection, tag_ids)
+        _remember_tags(self.db, collection)
+
+    def _search_collections_stmt(
+        self,
+        user_id: int,
+        query: str,
+        type_filter: Optional[str] = None,
+    ) -> Select:
+        """Unordered, unpaginated `SELECT` behind search_collections and its count."""
+        stmt = select(Collection).where(Collection.user_id == user_id)
 
-        await self.db.flush()
+        # Apply type filter
+        if type_filter is not None:
+            stmt = stmt.where(Collection.type == type_filter)
+
+        # Apply text search on title (full-text on PostgreSQL, infix ILIKE elsewhere)
+        if query:
+            stmt = stmt.where(_text_search(self.db, (Collection.title,), query))
+
+        return stmt
 
     async def search_collections(
         self,
@@ -98,49 +240,53 @@ class CollectionRepository:
         query: str,
         type_filter: Optional[str] = None,
         skip: int | None = None,
-        limit: int | None = None
+        limit: int | None = None,
+        after_updated_at: Optional[datetime] = None,
+        after_id: Optional[int] = None,
     ) -> Sequence[Collection]:
         """
         Search for collections belonging to a user, with an optional type filter and text search.
 
         Args:
             user_id: The ID of the user whose collections to search.
-            query: The search term for title/description (case-insensitive, infix).
+            query: The search term for title (word-prefix full-text on PostgreSQL, case-insensitive infix elsewhere).
             type_filter: Optional filter for collection type (e.g., 'mixed', 'tasks-only').
+            skip: Number of rows to skip (ignored when a keyset cursor is given).
+            limit: Maximum number of rows to return.
+            after_updated_at: Keyset cursor; `updated_at` of the last row of the previous page.
+            after_id: Keyset cursor; `id` of the last row of the previous page.
 
         Returns:
             A sequence of Collection objects matching the criteria.
         """
-        stmt = (
-            select(Collection)
-            .where(Collection.user_id == user_id)
-            .options(selectinload(Collection.tags)) # Ensure tags are loaded
-        )
-
-        # Apply type filter
-        if type_filter is not None:
-            stmt = stmt.where(Collection.type == type_filter)
+        stmt = self._search_collections_stmt(
+            user_id, query, type_filter
+        ).options(*_with_tag_ids(Collection))  # tag IDs only, aggregated in SQL
 
-        # Apply text search (case-insensitive infix match on title)
-        # Optionally include description: (Collection.title.ilike(...) | Collection.description.ilike(...))
-        if query:
-            search_term = f"%{query}%"
-            stmt = stmt.where(Collection.title.ilike(search_term))
-            # If you want to search description too:
-            # stmt = stmt.where(
-            #     (Collection.title.ilike(search_term)) |
-            #     (Collection.description.ilike(search_term))
-            # )
-
-        # Order results (e.g., by last updated, descending)
-        stmt = stmt.order_by(Collection.updated_at.desc())
-        if skip is not None:
-            stmt = stmt.offset(skip)
-        if limit is not None:
-            stmt = stmt.limit(limit)
+        # Newest first; keyset pagination when a cursor is given, else OFFSET
+        stmt = _paginate(stmt, Collection, skip, limit, after_updated_at, after_id)
         result = await self.db.execute(stmt)
         return result.scalars().all()
 
+    async def search_collections_with_count(
+        self, user_id: int, query: str, limit: int
+    ) -> tuple[Sequence[Collection], tuple[int, bool]]:
+        """First `limit` search_collections matches and their bounded count, in one statement."""
+        return await _first_page_with_count(
+            self.db, self._search_collections_stmt(user_id, query), Collection, limit, *_with_tag_ids(Collection)
+        )
+
+    async def count_search_collections(
+        self,
+        user_id: int,
+        query: str,
+        type_filter: Optional[str] = None,
+    ) -> tuple[int, bool]:
+        """Count search_collections matches up to `_SEARCH_COUNT_CAP`; returns `(count, exact)`."""
+        return await _bounded_count(
+            self.db, self._search_collections_stmt(user_id, query, type_filter)
+        )
+
 def get_collection_repository(db: AsyncSession = Depends(get_async_session)) -> CollectionRepository:
     return CollectionRepository(db)
 
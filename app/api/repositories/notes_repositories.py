@@ -1,13 +1,30 @@
-from typing import Iterable, Optional, Sequence
+from datetime import datetime
+from typing import AsyncIterator, Iterable, Optional, Sequence
 
 from fastapi import Depends
-from sqlalchemy import select
+from sqlalchemy import Select, select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
-
-from app.api.repositories._utils import _is_new_or_pending, _load_tags
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.api.repositories._utils import (
+    _COLLECTION_TYPE_BY_ID_AND_USER,
+    _STREAM_YIELD_PER,
+    _bounded_count,
+    _first_page_with_count,
+    _delete_owned,
+    _get_owned_with_tags,
+    _is_new_or_pending,
+    _load_tags,
+    _paginate,
+    _remember_tags,
+    _replace_tags,
+    _select_tags_by_ids,
+    _text_search,
+    _update_returning,
+    _with_tag_ids,
+)
 from app.schemas.database import get_async_session
-from app.schemas.models.collections_models import Collection
+from app.schemas.enums.collections_types import CollectionType
 from app.schemas.models.notes_models import Note
 from app.schemas.models.tags_models import Tag
 
@@ -16,54 +33,62 @@ class NoteRepository:
     def __init__(self, db: AsyncSession):
         self.db = db
 
-    async def get_notes_by_user(
+    def _notes_by_user_stmt(
         self, user_id: int, collection_id: Optional[int] = None
-    ) -> Sequence[Note]:
+    ) -> Select:
         stmt = (
             select(Note)
             .where(Note.user_id == user_id)
-            .options(selectinload(Note.tags))
+            .options(*_with_tag_ids(Note))
         )
         if collection_id:
             stmt = stmt.where(Note.collection_id == collection_id)
-        result = await self.db.execute(stmt)
+        return stmt
+
+    async def get_notes_by_user(
+        self, user_id: int, collection_id: Optional[int] = None
+    ) -> Sequence[Note]:
+        result = await self.db.execute(self._notes_by_user_stmt(user_id, collection_id))
         return result.scalars().all()
 
+    async def stream_notes_by_user(
+        self, user_id: int, collection_id: Optional[int] = None
+    ) -> AsyncIterator[Note]:
+        """Yield the user's notes in batches of `_STREAM_YIELD_PER` via a server-side cursor."""
+        stmt = self._notes_by_user_stmt(user_id, collection_id)
+        result = await self.db.stream_scalars(
+            stmt.execution_options(yield_per=_STREAM_YIELD_PER)
+        )
+        async for note in result:
+            yield note
+
     async def get_note_by_id(self, note_id: int) -> Note | None:
         return await self.db.get(Note, note_id)
 
     async def get_note_by_id_and_user(self, note_id: int, user_id: int) -> Note | None:
-        result = await self.db.execute(
-            select(Note)
-            .where(Note.id == note_id, Note.user_id == user_id)
-            .options(selectinload(Note.tags))
-        )
-        return result.scalar_one_or_none()
+        return await _get_owned_with_tags(self.db, Note, note_id, user_id)
 
     async def create_note(self, note_data: dict) -> Note:
         db_note = Note(**note_data)
         self.db.add(db_note)
-        await self.db.flush()
+        await self.db.flush()  # eager_defaults: RETURNING fills id/created_at
+        set_committed_value(db_note, "tags", [])  # a new row has no tags yet
         return db_note
 
     async def update_note(self, note: Note, update_data: dict) -> Note:
-        for key, value in update_data.items():
-            setattr(note, key, value)
-        await self.db.flush()
-        return note
+        return await _update_returning(self.db, note, update_data)
 
-    async def delete_note(self, note: Note) -> None:
-        await self.db.delete(note)
-        await self.db.flush()
+    async def delete_note_by_id_and_user(self, note_id: int, user_id: int) -> bool:
+        """Delete the user's note in place; False if it does not exist or is not theirs."""
+        return await _delete_owned(self.db, Note, note_id, user_id)
 
-    async def get_collection_by_id_and_user(
+    async def get_collection_type_for_user(
         self, collection_id: int, user_id: int
-    ) -> Collection | None:
+    ) -> CollectionType | None:
+        """Type of the user's collection, or None if it does not exist or is not theirs."""
         result = await self.db.execute(
-            select(Collection).where(
-                Collection.id == collection_id,
-                Collection.user_id == user_id,
-            )
+            _COLLECTION_TYPE_BY_ID_AND_USER,
+            {"obj_id": collection_id, "user_id": user_id},
         )
         return result.scalar_one_or_none()
 
@@ -73,23 +98,39 @@ class NoteRepository:
         if not tag_ids:
             return []
         result = await self.db.execute(
-            select(Tag).where(Tag.user_id == user_id, Tag.id.in_(tag_ids))
+            _select_tags_by_ids(self.db, user_id, tag_ids)
         )
         return result.scalars().all()
 
     async def set_note_tags(self, note: Note, tag_ids: Iterable[int]) -> None:
         """Replace note.tags with given tag IDs (async-safe)."""
-        tags = await _load_tags(self.db, user_id=note.user_id, tag_ids=tag_ids)
-
         if _is_new_or_pending(note):
-            note.tags = tags
+            note.tags = await _load_tags(self.db, note.user_id, tag_ids)
+            await self.db.flush()
         else:
-            await self.db.refresh(note, attribute_names=["tags"])
-            note.tags.clear()
-            note.tags.extend(tags)
+            await _replace_tags(self.db, note, tag_ids)
+        _remember_tags(self.db, note)
 
-        await self.db.flush()
+    def _search_notes_stmt(
+        self,
+        user_id: int,
+        query: str,
+        collection_id: Optional[int] = None,
+    ) -> Select:
+        """Unordered, unpaginated `SELECT` behind search_notes and its count."""
+        stmt = select(Note).where(Note.user_id == user_id)
 
+        # Apply collection filter
+        if collection_id is not None: # Explicitly check for None
+            stmt = stmt.where(Note.collection_id == collection_id)
+
+        # Apply text search (full-text on PostgreSQL, infix ILIKE elsewhere)
+        if query:
+            stmt = stmt.where(
+                _text_search(self.db, (Note.title, Note.description), query)
+            )
+
+        return stmt
 
     async def search_notes(
         self,
@@ -98,45 +139,52 @@ class NoteRepository:
         collection_id: Optional[int] = None,
         skip: int | None = None,
         limit: int | None = None,
+        after_updated_at: Optional[datetime] = None,
+        after_id: Optional[int] = None,
     ) -> Sequence[Note]:
         """
         Search for notes belonging to a user, with an optional collection filter and text search.
 
         Args:
             user_id: The ID of the user whose notes to search.
-            query: The search term for title/description (case-insensitive, infix).
+            query: The search term for title/description (word-prefix full-text on PostgreSQL, case-insensitive infix elsewhere).
             collection_id: Optional filter for collection ID.
+            skip: Number of rows to skip (ignored when a keyset cursor is given).
+            limit: Maximum number of rows to return.
+            after_updated_at: Keyset cursor; `updated_at` of the last row of the previous page.
+            after_id: Keyset cursor; `id` of the last row of the previous page.
 
         Returns:
             A sequence of Note objects matching the criteria.
         """
-        stmt = (
-            select(Note)
-            .where(Note.user_id == user_id)
-            .options(selectinload(Note.tags)) # Ensure tags are loaded
-        )
-
-        # Apply collection filter
-        if collection_id is not None: # Explicitly check for None
-            stmt = stmt.where(Note.collection_id == collection_id)
+        stmt = self._search_notes_stmt(
+            user_id, query, collection_id
+        ).options(*_with_tag_ids(Note))  # tag IDs only, aggregated in SQL
 
-        # Apply text search (case-insensitive infix match)
-        if query:
-            search_term = f"%{query}%"
-            stmt = stmt.where(
-                (Note.title.ilike(search_term)) |
-                (Note.description.ilike(search_term))
-            )
-
-        # Order results (e.g., by last updated, descending)
-        stmt = stmt.order_by(Note.updated_at.desc())
-        if skip is not None:
-            stmt = stmt.offset(skip)
-        if limit is not None:
-            stmt = stmt.limit(limit)
+        # Newest first; keyset pagination when a cursor is given, else OFFSET
+        stmt = _paginate(stmt, Note, skip, limit, after_updated_at, after_id)
         result = await self.db.execute(stmt)
         return result.scalars().all()
 
+    async def search_notes_with_count(
+        self, user_id: int, query: str, limit: int
+    ) -> tuple[Sequence[Note], tuple[int, bool]]:
+        """First `limit` search_notes matches and their bounded count, in one statement."""
+        return await _first_page_with_count(
+            self.db, self._search_notes_stmt(user_id, query), Note, limit, *_with_tag_ids(Note)
+        )
+
+    async def count_search_notes(
+        self,
+        user_id: int,
+        query: str,
+        collection_id: Optional[int] = None,
+    ) -> tuple[int, bool]:
+        """Count search_notes matches up to `_SEARCH_COUNT_CAP`; returns `(count, exact)`."""
+        return await _bounded_count(
+            self.db, self._search_notes_stmt(user_id, query, collection_id)
+        )
+
 
 def get_note_repository(db: AsyncSession = Depends(get_async_session)) -> NoteRepository:
     return NoteRepository(db)
@@ -1,11 +1,31 @@
 # app/api/repositories/tags_repositories.py
 from fastapi import Depends
+from sqlalchemy import Select, bindparam, exists
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from typing import List, Sequence
+from typing import List, Optional, Sequence
+from datetime import datetime
+from app.api.repositories._utils import (
+    _bounded_count,
+    _first_page_with_count,
+    _owned_by_id_stmt,
+    _paginate,
+    _tag_cache,
+    _text_search,
+    _update_returning,
+)
 from app.schemas.database import get_async_session
 from app.schemas.models.tags_models import Tag
 
+_TAG_BY_TITLE_AND_USER = select(Tag).where(
+    Tag.title == bindparam("title"), Tag.user_id == bindparam("user_id")
+)
+# Duplicate-title probe served by the (user_id, title) unique index, no row hydrated
+_TAG_TITLE_EXISTS = select(
+    exists().where(Tag.title == bindparam("title"), Tag.user_id == bindparam("user_id"))
+)
+
+
 class TagRepository:
     def __init__(self, db: AsyncSession):
         self.db = db
@@ -20,33 +40,50 @@ class TagRepository:
 
     async def get_tag_by_id_and_user(self, tag_id: int, user_id: int) -> Tag | None:
         result = await self.db.execute(
-            select(Tag).where(Tag.id == tag_id, Tag.user_id == user_id)
+            _owned_by_id_stmt(Tag), {"obj_id": tag_id, "user_id": user_id}
         )
         return result.scalar_one_or_none()
 
     async def get_tag_by_title_and_user(self, title: str, user_id: int) -> Tag | None:
         result = await self.db.execute(
-            select(Tag).where(Tag.title == title, Tag.user_id == user_id)
+            _TAG_BY_TITLE_AND_USER, {"title": title, "user_id": user_id}
         )
         return result.scalar_one_or_none()
 
+    async def tag_title_exists(self, title: str, user_id: int) -> bool:
+        result = await self.db.execute(
+            _TAG_TITLE_EXISTS, {"title": title, "user_id": user_id}
+        )
+        return result.scalar()
+
     async def create_tag(self, tag_data: dict) -> Tag:
         db_tag = Tag(**tag_data)
         self.db.add(db_tag)
-        await self.db.flush()
-        await self.db.refresh(db_tag)
+        await self.db.flush()  # eager_defaults: RETURNING fills id/created_at
         return db_tag
 
     async def update_tag(self, tag: Tag, title: str):
-        tag.title = title
-        await self.db.flush()
-        await self.db.refresh(tag)
-        return tag
+        return await _update_returning(self.db, tag, {"title": title})
 
     async def delete_tag(self, tag: Tag):
         await self.db.delete(tag)
         await self.db.flush()
+        _tag_cache(self.db).clear()  # memoised tag lists may include this tag
+
+
+    def _search_tags_stmt(
+        self,
+        user_id: int,
+        query: str,
+    ) -> Select:
+        """Unordered, unpaginated `SELECT` behind search_tags and its count."""
+        stmt = select(Tag).where(Tag.user_id == user_id)
+
+        # Apply text search on title (full-text on PostgreSQL, infix ILIKE elsewhere)
+        if query:
+            stmt = stmt.where(_text_search(self.db, (Tag.title,), query))
 
+        return stmt
 
     async def search_tags(
         self,
@@ -54,34 +91,48 @@ class TagRepository:
         query: str,
         skip: int | None = None,
         limit: int | None = None,
+        after_updated_at: Optional[datetime] = None,
+        after_id: Optional[int] = None,
     ) -> Sequence[Tag]:
         """
         Search for tags belonging to a user by title (case-insensitive, infix).
 
         Args:
             user_id: The ID of the user whose tags to search.
-            query: The search term for title (case-insensitive, infix).
+            query: The search term for title (word-prefix full-text on PostgreSQL, case-insensitive infix elsewhere).
+            skip: Number of rows to skip (ignored when a keyset cursor is given).
+            limit: Maximum number of rows to return.
+            after_updated_at: Keyset cursor; `updated_at` of the last row of the previous page.
+            after_id: Keyset cursor; `id` of the last row of the previous page.
 
         Returns:
             A sequence of Tag objects matching the criteria.
         """
-        stmt = select(Tag).where(Tag.user_id == user_id)
+        stmt = self._search_tags_stmt(user_id, query)
 
-        # Apply text search (case-insensitive infix match on title)
-        if query:
-            search_term = f"%{query}%"
-            stmt = stmt.where(Tag.title.ilike(search_term))
-
-        # Order results (e.g., by last updated, descending, or alphabetically)
-        stmt = stmt.order_by(Tag.updated_at.desc()) # Or Tag.title.asc()
-        if skip is not None:
-            stmt = stmt.offset(skip)
-        if limit is not None:
-            stmt = stmt.limit(limit)
-            
+        # Newest first; keyset pagination when a cursor is given, else OFFSET
+        stmt = _paginate(stmt, Tag, skip, limit, after_updated_at, after_id)
         result = await self.db.execute(stmt)
         return result.scalars().all()
 
+    async def search_tags_with_count(
+        self, user_id: int, query: str, limit: int
+    ) -> tuple[Sequence[Tag], tuple[int, bool]]:
+        """First `limit` search_tags matches and their bounded count, in one statement."""
+        return await _first_page_with_count(
+            self.db, self._search_tags_stmt(user_id, query), Tag, limit
+        )
+
+    async def count_search_tags(
+        self,
+        user_id: int,
+        query: str,
+    ) -> tuple[int, bool]:
+        """Count search_tags matches up to `_SEARCH_COUNT_CAP`; returns `(count, exact)`."""
+        return await _bounded_count(
+            self.db, self._search_tags_stmt(user_id, query)
+        )
+
 # Dependency
 def get_tag_repository(
     db: AsyncSession = Depends(get_async_session)
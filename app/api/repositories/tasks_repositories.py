@@ -1,13 +1,30 @@
-from typing import Iterable, Optional, Sequence
+from datetime import datetime
+from typing import AsyncIterator, Iterable, Optional, Sequence
 
 from fastapi import Depends
-from sqlalchemy import select
+from sqlalchemy import Select, select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
-
-from app.api.repositories._utils import _is_new_or_pending, _load_tags
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.api.repositories._utils import (
+    _COLLECTION_TYPE_BY_ID_AND_USER,
+    _STREAM_YIELD_PER,
+    _bounded_count,
+    _first_page_with_count,
+    _delete_owned,
+    _get_owned_with_tags,
+    _is_new_or_pending,
+    _load_tags,
+    _paginate,
+    _remember_tags,
+    _replace_tags,
+    _select_tags_by_ids,
+    _text_search,
+    _update_returning,
+    _with_tag_ids,
+)
 from app.schemas.database import get_async_session
-from app.schemas.models.collections_models import Collection
+from app.schemas.enums.collections_types import CollectionType
 from app.schemas.models.tags_models import Tag
 from app.schemas.models.tasks_models import Task
 
@@ -16,17 +33,17 @@ class TaskRepository:
     def __init__(self, db: AsyncSession):
         self.db = db
 
-    async def get_tasks_by_user(
+    def _tasks_by_user_stmt(
         self,
         user_id: int,
         status: Optional[str] = None,
         priority: Optional[str] = None,
         collection_id: Optional[int] = None,
-    ) -> Sequence[Task]:
+    ) -> Select:
         stmt = (
             select(Task)
             .where(Task.user_id == user_id)
-            .options(selectinload(Task.tags))
+            .options(*_with_tag_ids(Task))
         )
         if status:
             stmt = stmt.where(Task.status == status)
@@ -34,44 +51,61 @@ class TaskRepository:
             stmt = stmt.where(Task.priority == priority)
         if collection_id:
             stmt = stmt.where(Task.collection_id == collection_id)
+        return stmt
+
+    async def get_tasks_by_user(
+        self,
+        user_id: int,
+        status: Optional[str] = None,
+        priority: Optional[str] = None,
+        collection_id: Optional[int] = None,
+    ) -> Sequence[Task]:
+        stmt = self._tasks_by_user_stmt(user_id, status, priority, collection_id)
         result = await self.db.execute(stmt)
         return result.scalars().all()
 
+    async def stream_tasks_by_user(
+        self,
+        user_id: int,
+        status: Optional[str] = None,
+        priority: Optional[str] = None,
+        collection_id: Optional[int] = None,
+    ) -> AsyncIterator[Task]:
+        """Yield the user's tasks in batches of `_STREAM_YIELD_PER` via a server-side cursor."""
+        stmt = self._tasks_by_user_stmt(user_id, status, priority, collection_id)
+        result = await self.db.stream_scalars(
+            stmt.execution_options(yield_per=_STREAM_YIELD_PER)
+        )
+        async for task in result:
+            yield task
+
     async def get_task_by_id(self, task_id: int) -> Task | None:
         return await self.db.get(Task, task_id)
 
     async def get_task_by_id_and_user(self, task_id: int, user_id: int) -> Task | None:
-        result = await self.db.execute(
-            select(Task)
-            .where(Task.id == task_id, Task.user_id == user_id)
-            .options(selectinload(Task.tags))
-        )
-        return result.scalar_one_or_none()
+        return await _get_owned_with_tags(self.db, Task, task_id, user_id)
 
     async def create_task(self, task_data: dict) -> Task:
         db_task = Task(**task_data)
         self.db.add(db_task)
-        await self.db.flush()  # service will commit
+        await self.db.flush()  # eager_defaults: RETURNING fills id/created_at
+        set_committed_value(db_task, "tags", [])  # a new row has no tags yet
         return db_task
 
     async def update_task(self, task: Task, update_data: dict) -> Task:
-        for key, value in update_data.items():
-            setattr(task, key, value)
-        await self.db.flush()
-        return task
+        return await _update_returning(self.db, task, update_data)
 
-    async def delete_task(self, task: Task) -> None:
-        await self.db.delete(task)
-        await self.db.flush()
+    async def delete_task_by_id_and_user(self, task_id: int, user_id: int) -> bool:
+        """Delete the user's task in place; False if it does not exist or is not theirs."""
+        return await _delete_owned(self.db, Task, task_id, user_id)
 
-    async def get_collection_by_id_and_user(
+    async def get_collection_type_for_user(
         self, collection_id: int, user_id: int
-    ) -> Collection | None:
+    ) -> CollectionType | None:
+        """Type of the user's collection, or None if it does not exist or is not theirs."""
         result = await self.db.execute(
-            select(Collection).where(
-                Collection.id == collection_id,
-                Collection.user_id == user_id,
-            )
+            _COLLECTION_TYPE_BY_ID_AND_USER,
+            {"obj_id": collection_id, "user_id": user_id},
         )
         return result.scalar_one_or_none()
 
@@ -81,23 +115,45 @@ class TaskRepository:
         if not tag_ids:
             return []
         result = await self.db.execute(
-            select(Tag).where(Tag.user_id == user_id, Tag.id.in_(tag_ids))
+            _select_tags_by_ids(self.db, user_id, tag_ids)
         )
         return result.scalars().all()
 
     async def set_task_tags(self, task: Task, tag_ids: Iterable[int]) -> None:
         """Replace task.tags with given tag IDs (async-safe)."""
-        tags = await _load_tags(self.db, user_id=task.user_id, tag_ids=tag_ids)
-
         if _is_new_or_pending(task):
-            task.tags = tags
+            task.tags = await _load_tags(self.db, task.user_id, tag_ids)
+            await self.db.flush()
         else:
-            await self.db.refresh(task, attribute_names=["tags"])
-            task.tags.clear()
-            task.tags.extend(tags)
+            await _replace_tags(self.db, task, tag_ids)
+        _remember_tags(self.db, task)
+
+    def _search_tasks_stmt(
+        self,
+        user_id: int,
+        query: str,
+        status: Optional[str] = None,
+        priority: Optional[str] = None,
+        collection_id: Optional[int] = None,
+    ) -> Select:
+        """Unordered, unpaginated `SELECT` behind search_tasks and its count."""
+        stmt = select(Task).where(Task.user_id == user_id)
+
+        # Apply filters
+        if status:
+            stmt = stmt.where(Task.status == status)
+        if priority:
+            stmt = stmt.where(Task.priority == priority)
+        if collection_id:
+            stmt = stmt.where(Task.collection_id == collection_id)
 
-        await self.db.flush()
+        # Apply text search (full-text on PostgreSQL, infix ILIKE elsewhere)
+        if query:
+            stmt = stmt.where(
+                _text_search(self.db, (Task.title, Task.description), query)
+            )
 
+        return stmt
 
     async def search_tasks(
         self,
@@ -108,61 +164,56 @@ class TaskRepository:
         collection_id: Optional[int] = None,
         skip: int | None = None,
         limit: int | None = None,
+        after_updated_at: Optional[datetime] = None,
+        after_id: Optional[int] = None,
     ) -> Sequence[Task]:
         """
         Search for tasks belonging to a user, with optional filters and text search.
 
         Args:
             user_id: The ID of the user whose tasks to search.
-            query: The search term for title/description (case-insensitive, infix).
+            query: The search term for title/description (word-prefix full-text on PostgreSQL, case-insensitive infix elsewhere).
             status: Optional filter for task status.
             priority: Optional filter for task priority.
             collection_id: Optional filter for collection ID.
+            skip: Number of rows to skip (ignored when a keyset cursor is given).
+            limit: Maximum number of rows to return.
+            after_updated_at: Keyset cursor; `updated_at` of the last row of the previous page.
+            after_id: Keyset cursor; `id` of the last row of the previous page.
 
         Returns:
             A sequence of Task objects matching the criteria.
         """
-        stmt = (
-            select(Task)
-            .where(Task.user_id == user_id)
-            .options(selectinload(Task.tags)) # Ensure tags are loaded
-        )
-
-        # Apply filters
-        if status:
-            stmt = stmt.where(Task.status == status)
-        if priority:
-            stmt = stmt.where(Task.priority == priority)
-        if collection_id:
-            stmt = stmt.where(Task.collection_id == collection_id)
+        stmt = self._search_tasks_stmt(
+            user_id, query, status, priority, collection_id
+        ).options(*_with_tag_ids(Task))  # tag IDs only, aggregated in SQL
 
-        # Apply text search (case-insensitive infix match)
-        if query:
-            # Basic escaping for LIKE wildcards (optional, for stricter matching)
-            # escaped_query = query.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
-            # search_term = f"%{escaped_query}%"
-            # stmt = stmt.where(
-            #     (Task.title.ilike(search_term)) |
-            #     (Task.description.ilike(search_term))
-            # ).params(escape_char='\\') # Requires setting ESCAPE in raw SQL or using func
-
-            # Simpler approach using standard parameter binding (SQLAlchemy handles % correctly)
-            # This allows user input like "10%" to match literally if present.
-            search_term = f"%{query}%"
-            stmt = stmt.where(
-                (Task.title.ilike(search_term)) |
-                (Task.description.ilike(search_term))
-            )
-
-        # Order results (e.g., by last updated, descending)
-        stmt = stmt.order_by(Task.updated_at.desc())
-        if skip is not None:
-            stmt = stmt.offset(skip)
-        if limit is not None:
-            stmt = stmt.limit(limit)
+        # Newest first; keyset pagination when a cursor is given, else OFFSET
+        stmt = _paginate(stmt, Task, skip, limit, after_updated_at, after_id)
         result = await self.db.execute(stmt)
         return result.scalars().all()
 
+    async def search_tasks_with_count(
+        self, user_id: int, query: str, limit: int
+    ) -> tuple[Sequence[Task], tuple[int, bool]]:
+        """First `limit` search_tasks matches and their bounded count, in one statement."""
+        return await _first_page_with_count(
+            self.db, self._search_tasks_stmt(user_id, query), Task, limit, *_with_tag_ids(Task)
+        )
+
+    async def count_search_tasks(
+        self,
+        user_id: int,
+        query: str,
+        status: Optional[str] = None,
+        priority: Optional[str] = None,
+        collection_id: Optional[int] = None,
+    ) -> tuple[int, bool]:
+        """Count search_tasks matches up to `_SEARCH_COUNT_CAP`; returns `(count, exact)`."""
+        return await _bounded_count(
+            self.db, self._search_tasks_stmt(user_id, query, status, priority, collection_id)
+        )
+
 
 def get_task_repository(db: AsyncSession = Depends(get_async_session)) -> TaskRepository:
     return TaskRepository(db)
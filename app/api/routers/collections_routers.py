@@ -1,11 +1,15 @@
 # app/api/routers/collections_routers.py
+from datetime import datetime
 from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional
 from app.schemas.contracts.collections_dtos import CollectionCreate, CollectionOut, CollectionWithItems
-from app.schemas.models.users_models import User
+from app.schemas.contracts.users_dtos import UserOut
 from app.schemas.database import get_async_session
+from app.schemas.contracts.search_dtos import SearchCount, SearchQuery
 from app.utility.auth import get_current_user
+from app.utility.streaming import ndjson_response
 # from app.api.repositories.collections_repositories import get_collection_repository # Not needed directly in endpoints
 from app.api.services.collections_services import get_collection_service
 # from app.api.repositories.collections_repositories import CollectionRepository # Not needed directly in endpoints
@@ -15,11 +19,13 @@ router = APIRouter(prefix="/collections", tags=["collections"])
 
 @router.get("/search", response_model=List[CollectionOut]) # Use CollectionOut for consistent serialization
 async def search_collections(
-    q: str = Query(..., alias="q", min_length=2, description="Search term for collection title"),
+    search: SearchQuery = Depends(),
     type: str = None, # Maps to CollectionType enum string value
     skip: int = Query(0, ge=0, description="Number of results to skip"),
     limit: int = Query(20, ge=1, le=100, description="Maximum number of results to return"), # Reasonable limit
-    current_user: User = Depends(get_current_user),
+    after_updated_at: Optional[datetime] = Query(None, description="Keyset cursor: updated_at of the last result of the previous page"),
+    after_id: Optional[int] = Query(None, description="Keyset cursor: id of the last result of the previous page"),
+    current_user: UserOut = Depends(get_current_user),
     collection_service: CollectionService = Depends(get_collection_service),
 ):
     """
@@ -30,23 +36,42 @@ async def search_collections(
     - type: Filter by collection type (e.g., 'mixed', 'tasks-only', 'notes-only').
     - skip: Number of results to skip (for pagination).
     - limit: Maximum number of results to return (max 100).
+    - after_updated_at / after_id: Keyset cursor taken from the last result of the
+      previous page; when both are given they replace `skip` for deep pagination.
     """
-    # Call the service method
-    collections = await collection_service.search_user_collections(
+    # Pagination is applied in SQL (LIMIT + OFFSET or keyset)
+    return await collection_service.search_user_collections(
         user_id=current_user.id,
-        query=q,
+        query=search.q,
         type_filter=type, # Pass the type filter string
+        skip=skip,
+        limit=limit,
+        after_updated_at=after_updated_at,
+        after_id=after_id,
     )
 
-    # Apply pagination in-memory
-    paginated_collections = collections[skip : skip + limit]
+@router.get("/search/count", response_model=SearchCount)
+async def count_search_collections(
+    search: SearchQuery = Depends(),
+    type: str = None, # Maps to CollectionType enum string value
+    current_user: UserOut = Depends(get_current_user),
+    collection_service: CollectionService = Depends(get_collection_service),
+):
+    """
+    Count the results of /collections/search without fetching them.
 
-    return paginated_collections
+    The count stops at 1000; `exact` is false when more rows match.
+    """
+    return await collection_service.count_user_collections_search(
+        user_id=current_user.id,
+        query=search.q,
+        type_filter=type,
+    )
 
 @router.get("/", response_model=List[CollectionOut])
 async def list_collections(
     type: str = None,
-    current_user: User = Depends(get_current_user),
+    current_user: UserOut = Depends(get_current_user),
     collection_service: CollectionService = Depends(get_collection_service),
     # collection_repo: CollectionRepository = Depends(get_collection_repository), # Remove
     # db: AsyncSession = Depends(get_async_session) # Not needed if service handles persistence
@@ -54,10 +79,20 @@ async def list_collections(
     # collection_service.collection_repo = collection_repo # Remove
     return await collection_service.get_user_collections(current_user.id, type)
 
+@router.get("/stream", response_class=StreamingResponse)
+async def stream_collections(
+    type: str = None,
+    current_user: UserOut = Depends(get_current_user),
+    collection_service: CollectionService = Depends(get_collection_service),
+):
+    """Stream all of the user's collections as NDJSON (one CollectionOut per line), for very large listings."""
+    collections = collection_service.stream_user_collections(current_user.id, type)
+    return ndjson_response(collections, CollectionOut)
+
 @router.get("/{collection_id}", response_model=CollectionWithItems)
 async def get_collection(
     collection_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: UserOut = Depends(get_current_user),
     collection_service: CollectionService = Depends(get_collection_service),
     # collection_repo: CollectionRepository = Depends(get_collection_repository), # Remove
     # db: AsyncSession = Depends(get_async_session) # Not needed if service handles persistence
@@ -71,7 +106,7 @@ async def get_collection(
 @router.post("/", response_model=CollectionOut, status_code=201)
 async def create_collection(
     collection: CollectionCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: UserOut = Depends(get_current_user),
     collection_service: CollectionService = Depends(get_collection_service),
     # collection_repo: CollectionRepository = Depends(get_collection_repository), # Remove
     # db: AsyncSession = Depends(get_async_session) # Not needed if service handles persistence
@@ -83,7 +118,7 @@ async def create_collection(
 async def update_collection(
     collection_id: int,
     collection_update: CollectionCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: UserOut = Depends(get_current_user),
     collection_service: CollectionService = Depends(get_collection_service),
     # collection_repo: CollectionRepository = Depends(get_collection_repository), # Remove
     # db: AsyncSession = Depends(get_async_session) # Not needed if service handles persistence
@@ -96,7 +131,7 @@ async def update_collection(
 @router.delete("/{collection_id}", status_code=204)
 async def delete_collection(
     collection_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: UserOut = Depends(get_current_user),
     collection_service: CollectionService = Depends(get_collection_service),
     # collection_repo: CollectionRepository = Depends(get_collection_repository), # Remove
     # db: AsyncSession = Depends(get_async_session) # Not needed if service handles persistence
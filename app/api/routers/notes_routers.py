@@ -1,11 +1,15 @@
 # app/api/routers/notes_routers.py
+from datetime import datetime
 from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional
 from app.schemas.contracts.notes_dtos import NoteCreate, NoteOut, NoteBase
-from app.schemas.models.users_models import User
+from app.schemas.contracts.users_dtos import UserOut
 from app.schemas.database import get_async_session
+from app.schemas.contracts.search_dtos import SearchCount, SearchQuery
 from app.utility.auth import get_current_user
+from app.utility.streaming import ndjson_response
 # from app.api.repositories.notes_repositories import get_note_repository # Not needed directly in endpoints
 from app.api.services.notes_services import get_note_service
 # from app.api.repositories.notes_repositories import NoteRepository # Not needed directly in endpoints
@@ -15,11 +19,13 @@ router = APIRouter(prefix="/notes", tags=["notes"])
 
 @router.get("/search", response_model=List[NoteOut]) # Use NoteOut for consistent serialization
 async def search_notes(
-    q: str = Query(..., alias="q", min_length=2, description="Search term for title/description"),
+    search: SearchQuery = Depends(),
     collection_id: int = None,
     skip: int = Query(0, ge=0, description="Number of results to skip"),
     limit: int = Query(20, ge=1, le=100, description="Maximum number of results to return"), # Reasonable limit
-    current_user: User = Depends(get_current_user),
+    after_updated_at: Optional[datetime] = Query(None, description="Keyset cursor: updated_at of the last result of the previous page"),
+    after_id: Optional[int] = Query(None, description="Keyset cursor: id of the last result of the previous page"),
+    current_user: UserOut = Depends(get_current_user),
     note_service: NoteService = Depends(get_note_service),
 ):
     """
@@ -30,23 +36,42 @@ async def search_notes(
     - collection_id: Filter by collection ID.
     - skip: Number of results to skip (for pagination).
     - limit: Maximum number of results to return (max 100).
+    - after_updated_at / after_id: Keyset cursor taken from the last result of the
+      previous page; when both are given they replace `skip` for deep pagination.
     """
-    # Call the service method
-    notes = await note_service.search_user_notes(
+    # Pagination is applied in SQL (LIMIT + OFFSET or keyset)
+    return await note_service.search_user_notes(
         user_id=current_user.id,
-        query=q,
+        query=search.q,
         collection_id=collection_id,
+        skip=skip,
+        limit=limit,
+        after_updated_at=after_updated_at,
+        after_id=after_id,
     )
 
-    # Apply pagination in-memory
-    paginated_notes = notes[skip : skip + limit]
+@router.get("/search/count", response_model=SearchCount)
+async def count_search_notes(
+    search: SearchQuery = Depends(),
+    collection_id: int = None,
+    current_user: UserOut = Depends(get_current_user),
+    note_service: NoteService = Depends(get_note_service),
+):
+    """
+    Count the results of /notes/search without fetching them.
 
-    return paginated_notes
+    The count stops at 1000; `exact` is false when more rows match.
+    """
+    return await note_service.count_user_notes_search(
+        user_id=current_user.id,
+        query=search.q,
+        collection_id=collection_id,
+    )
 
 @router.get("/", response_model=List[NoteOut])
 async def list_notes(
     collection_id: int = None,
-    current_user: User = Depends(get_current_user),
+    current_user: UserOut = Depends(get_current_user),
     note_service: NoteService = Depends(get_note_service),
     # note_repo: NoteRepository = Depends(get_note_repository), # Remove
     # db: AsyncSession = Depends(get_async_session) # Not needed if service handles persistence
@@ -54,10 +79,20 @@ async def list_notes(
     # note_service.note_repo = note_repo # Remove
     return await note_service.get_user_notes(current_user.id, collection_id)
 
+@router.get("/stream", response_class=StreamingResponse)
+async def stream_notes(
+    collection_id: int = None,
+    current_user: UserOut = Depends(get_current_user),
+    note_service: NoteService = Depends(get_note_service),
+):
+    """Stream all of the user's notes as NDJSON (one NoteOut per line), for very large listings."""
+    notes = note_service.stream_user_notes(current_user.id, collection_id)
+    return ndjson_response(notes, NoteOut)
+
 @router.get("/{note_id}", response_model=NoteOut)
 async def get_note(
     note_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: UserOut = Depends(get_current_user),
     note_service: NoteService = Depends(get_note_service),
     # note_repo: NoteRepository = Depends(get_note_repository), # Remove
     # db: AsyncSession = Depends(get_async_session) # Not needed if service handles persistence
@@ -68,7 +103,7 @@ async def get_note(
 @router.post("/", response_model=NoteOut, status_code=201)
 async def create_note(
     note: NoteCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: UserOut = Depends(get_current_user),
     note_service: NoteService = Depends(get_note_service),
     # note_repo: NoteRepository = Depends(get_note_repository), # Remove
     # db: AsyncSession = Depends(get_async_session) # Not needed if service handles persistence
@@ -80,7 +115,7 @@ async def create_note(
 async def update_note(
     note_id: int,
     note_update: NoteBase,
-    current_user: User = Depends(get_current_user),
+    current_user: UserOut = Depends(get_current_user),
     note_service: NoteService = Depends(get_note_service),
     # note_repo: NoteRepository = Depends(get_note_repository), # Remove
     # db: AsyncSession = Depends(get_async_session) # Not needed if service handles persistence
@@ -91,7 +126,7 @@ async def update_note(
 @router.delete("/{note_id}", status_code=204)
 async def delete_note(
     note_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: UserOut = Depends(get_current_user),
     note_service: NoteService = Depends(get_note_service),
     # note_repo: NoteRepository = Depends(get_note_repository), # Remove
     # db: AsyncSession = Depends(get_async_session) # Not needed if service handles persistence
@@ -1,9 +1,10 @@
 # app/api/routers/search_routers.py
-from fastapi import APIRouter, Depends, Query
-from typing import Dict, Any
+import orjson
+from fastapi import APIRouter, Depends, Query, Response
 
 # Import models/user for auth
-from app.schemas.models.users_models import User
+from app.schemas.contracts.search_dtos import SearchQuery
+from app.schemas.contracts.users_dtos import UserOut
 from app.utility.auth import get_current_user
 
 # Import the new service and its dependency
@@ -12,11 +13,12 @@ from app.api.services.search_services import SearchService, get_search_service
 # Create the router with a prefix and tags
 router = APIRouter(prefix="/search", tags=["search"])
 
-@router.get("/global", response_model=Dict[str, Any]) # Basic dict response for now
+# The service already returns JSON-ready dicts, so skip response_model re-validation
+@router.get("/global", response_model=None)
 async def global_search(
-    q: str = Query(..., alias="q", min_length=2, description="Global search term"),
+    search: SearchQuery = Depends(),
     limit: int = Query(20, ge=1, le=100, description="Max results per entity type (default 20)"),
-    current_user: User = Depends(get_current_user),
+    current_user: UserOut = Depends(get_current_user),
     search_service: SearchService = Depends(get_search_service),
 ):
     """
@@ -28,7 +30,7 @@ async def global_search(
     """
     results = await search_service.global_search(
         user_id=current_user.id,
-        query=q,
+        query=search.q,
         limit_per_type=limit
     )
-    return results
+    return Response(content=orjson.dumps(results), media_type="application/json")
@@ -1,10 +1,12 @@
 # app/api/routers/tags_routers.py
+from datetime import datetime
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional
 from app.schemas.contracts.tags_dtos import TagCreate, TagOut
-from app.schemas.models.users_models import User
+from app.schemas.contracts.users_dtos import UserOut
 from app.schemas.database import get_async_session
+from app.schemas.contracts.search_dtos import SearchCount, SearchQuery
 from app.utility.auth import get_current_user
 # from app.api.repositories.tags_repositories import get_tag_repository # Not needed directly in endpoints
 from app.api.services.tags_services import get_tag_service
@@ -15,10 +17,12 @@ router = APIRouter(prefix="/tags", tags=["tags"])
 
 @router.get("/search", response_model=List[TagOut]) # Use TagOut for consistent serialization
 async def search_tags(
-    q: str = Query(..., alias="q", min_length=2, description="Search term for tag title"),
+    search: SearchQuery = Depends(),
     skip: int = Query(0, ge=0, description="Number of results to skip"),
     limit: int = Query(20, ge=1, le=100, description="Maximum number of results to return"), # Reasonable limit
-    current_user: User = Depends(get_current_user),
+    after_updated_at: Optional[datetime] = Query(None, description="Keyset cursor: updated_at of the last result of the previous page"),
+    after_id: Optional[int] = Query(None, description="Keyset cursor: id of the last result of the previous page"),
+    current_user: UserOut = Depends(get_current_user),
     tag_service: TagService = Depends(get_tag_service),
 ):
     """
@@ -28,21 +32,38 @@ async def search_tags(
     - q: The search term (required, min 2 chars).
     - skip: Number of results to skip (for pagination).
     - limit: Maximum number of results to return (max 100).
+    - after_updated_at / after_id: Keyset cursor taken from the last result of the
+      previous page; when both are given they replace `skip` for deep pagination.
     """
-    # Call the service method
-    tags = await tag_service.search_user_tags(
+    # Pagination is applied in SQL (LIMIT + OFFSET or keyset)
+    return await tag_service.search_user_tags(
         user_id=current_user.id,
-        query=q,
+        query=search.q,
+        skip=skip,
+        limit=limit,
+        after_updated_at=after_updated_at,
+        after_id=after_id,
     )
 
-    # Apply pagination in-memory
-    paginated_tags = tags[skip : skip + limit]
+@router.get("/search/count", response_model=SearchCount)
+async def count_search_tags(
+    search: SearchQuery = Depends(),
+    current_user: UserOut = Depends(get_current_user),
+    tag_service: TagService = Depends(get_tag_service),
+):
+    """
+    Count the results of /tags/search without fetching them.
 
-    return paginated_tags
+    The count stops at 1000; `exact` is false when more rows match.
+    """
+    return await tag_service.count_user_tags_search(
+        user_id=current_user.id,
+        query=search.q,
+    )
 
 @router.get("/", response_model=List[TagOut])
 async def list_tags(
-    current_user: User = Depends(get_current_user),
+    current_user: UserOut = Depends(get_current_user),
     tag_service: TagService = Depends(get_tag_service),
     # tag_repo: TagRepository = Depends(get_tag_repository), # Remove
     # db: AsyncSession = Depends(get_async_session) # Not needed if service handles persistence
@@ -53,7 +74,7 @@ async def list_tags(
 @router.get("/{tag_id}", response_model=TagOut)
 async def get_tag(
     tag_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: UserOut = Depends(get_current_user),
     tag_service: TagService = Depends(get_tag_service),
     # tag_repo: TagRepository = Depends(get_tag_repository), # Remove
     # db: AsyncSession = Depends(get_async_session) # Not needed if service handles persistence
@@ -64,7 +85,7 @@ async def get_tag(
 @router.post("/", response_model=TagOut, status_code=201)
 async def create_tag(
     tag: TagCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: UserOut = Depends(get_current_user),
     tag_service: TagService = Depends(get_tag_service),
     # tag_repo: TagRepository = Depends(get_tag_repository), # Remove
     # db: AsyncSession = Depends(get_async_session) # Not needed if service handles persistence
@@ -76,7 +97,7 @@ async def create_tag(
 async def update_tag(
     tag_id: int,
     tag_update: TagCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: UserOut = Depends(get_current_user),
     tag_service: TagService = Depends(get_tag_service),
     # tag_repo: TagRepository = Depends(get_tag_repository), # Remove
     # db: AsyncSession = Depends(get_async_session) # Not needed if service handles persistence
@@ -87,7 +108,7 @@ async def update_tag(
 @router.delete("/{tag_id}", status_code=204)
 async def delete_tag(
     tag_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: UserOut = Depends(get_current_user),
     tag_service: TagService = Depends(get_tag_service),
     # tag_repo: TagRepository = Depends(get_tag_repository), # Remove
     # db: AsyncSession = Depends(get_async_session) # Not needed if service handles persistence
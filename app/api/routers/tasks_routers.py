@@ -1,11 +1,15 @@
 # app/api/routers/tasks_routers.py
+from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from app.schemas.contracts.tasks_dtos import TaskCreate, TaskOut, TaskBase
-from app.schemas.models.users_models import User
+from app.schemas.contracts.users_dtos import UserOut
 from app.schemas.database import get_async_session
+from app.schemas.contracts.search_dtos import SearchCount, SearchQuery
 from app.utility.auth import get_current_user
+from app.utility.streaming import ndjson_response
 # from app.api.repositories.tasks_repositories import get_task_repository # Not needed directly in endpoints
 from app.api.services.tasks_services import get_task_service
 # from app.api.repositories.tasks_repositories import TaskRepository # Not needed directly in endpoints
@@ -16,13 +20,15 @@ router = APIRouter(prefix="/tasks", tags=["tasks"])
 
 @router.get("/search", response_model=List[TaskOut]) # Use TaskOut for consistent serialization
 async def search_tasks(
-    q: str = Query(..., alias="q", min_length=2, description="Search term for title/description"),
+    search: SearchQuery = Depends(),
     status: str = None,
     priority: str = None,
     collection_id: int = None,
     skip: int = Query(0, ge=0, description="Number of results to skip"),
     limit: int = Query(20, ge=1, le=100, description="Maximum number of results to return"), # Reasonable limit
-    current_user: User = Depends(get_current_user),
+    after_updated_at: Optional[datetime] = Query(None, description="Keyset cursor: updated_at of the last result of the previous page"),
+    after_id: Optional[int] = Query(None, description="Keyset cursor: id of the last result of the previous page"),
+    current_user: UserOut = Depends(get_current_user),
     task_service: TaskService = Depends(get_task_service),
 ):
     """
@@ -35,30 +41,50 @@ async def search_tasks(
     - collection_id: Filter by collection ID.
     - skip: Number of results to skip (for pagination).
     - limit: Maximum number of results to return (max 100).
+    - after_updated_at / after_id: Keyset cursor taken from the last result of the
+      previous page; when both are given they replace `skip` for deep pagination.
     """
-    # Call the service method
-    tasks = await task_service.search_user_tasks(
+    # Pagination is applied in SQL (LIMIT + OFFSET or keyset)
+    return await task_service.search_user_tasks(
         user_id=current_user.id,
-        query=q,
+        query=search.q,
         status=status,
         priority=priority,
         collection_id=collection_id,
+        skip=skip,
+        limit=limit,
+        after_updated_at=after_updated_at,
+        after_id=after_id,
     )
 
-    # Apply pagination in-memory (as suggested in the plan)
-    # This is because complex ordering combined with LIKE can make DB-level pagination tricky.
-    paginated_tasks = tasks[skip : skip + limit]
-
-    return paginated_tasks
-
+@router.get("/search/count", response_model=SearchCount)
+async def count_search_tasks(
+    search: SearchQuery = Depends(),
+    status: str = None,
+    priority: str = None,
+    collection_id: int = None,
+    current_user: UserOut = Depends(get_current_user),
+    task_service: TaskService = Depends(get_task_service),
+):
+    """
+    Count the results of /tasks/search without fetching them.
 
+    The count stops at 1000; `exact` is false when more rows match.
+    """
+    return await task_service.count_user_tasks_search(
+        user_id=current_user.id,
+        query=search.q,
+        status=status,
+        priority=priority,
+        collection_id=collection_id,
+    )
 
 @router.get("/", response_model=List[TaskOut])
 async def list_tasks(
     status: str = None,
     priority: str = None,
     collection_id: int = None,
-    current_user: User = Depends(get_current_user),
+    current_user: UserOut = Depends(get_current_user),
     task_service: TaskService = Depends(get_task_service),
     # task_repo: TaskRepository = Depends(get_task_repository), # Remove
     # db: AsyncSession = Depends(get_async_session) # Not needed if service handles persistence
@@ -68,10 +94,22 @@ async def list_tasks(
         current_user.id, status, priority, collection_id
     )
 
+@router.get("/stream", response_class=StreamingResponse)
+async def stream_tasks(
+    status: str = None,
+    priority: str = None,
+    collection_id: int = None,
+    current_user: UserOut = Depends(get_current_user),
+    task_service: TaskService = Depends(get_task_service),
+):
+    """Stream all of the user's tasks as NDJSON (one TaskOut per line), for very large listings."""
+    tasks = task_service.stream_user_tasks(current_user.id, status, priority, collection_id)
+    return ndjson_response(tasks, TaskOut)
+
 @router.get("/{task_id}", response_model=TaskOut)
 async def get_task(
     task_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: UserOut = Depends(get_current_user),
     task_service: TaskService = Depends(get_task_service),
     # task_repo: TaskRepository = Depends(get_task_repository), # Remove
     # db: AsyncSession = Depends(get_async_session) # Not needed if service handles persistence
@@ -82,7 +120,7 @@ async def get_task(
 @router.post("/", response_model=TaskOut, status_code=201)
 async def create_task(
     task: TaskCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: UserOut = Depends(get_current_user),
     task_service: TaskService = Depends(get_task_service),
     # task_repo: TaskRepository = Depends(get_task_repository), # Remove
     # db: AsyncSession = Depends(get_async_session) # Not needed if service handles persistence
@@ -94,7 +132,7 @@ async def create_task(
 async def update_task(
     task_id: int,
     task_update: TaskBase,
-    current_user: User = Depends(get_current_user),
+    current_user: UserOut = Depends(get_current_user),
     task_service: TaskService = Depends(get_task_service),
     # task_repo: TaskRepository = Depends(get_task_repository), # Remove
     # db: AsyncSession = Depends(get_async_session) # Not needed if service handles persistence
@@ -107,7 +145,7 @@ async def update_task(
 @router.delete("/{task_id}", status_code=204)
 async def delete_task(
     task_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: UserOut = Depends(get_current_user),
     task_service: TaskService = Depends(get_task_service),
     # task_repo: TaskRepository = Depends(get_task_repository), # Remove
     # db: AsyncSession = Depends(get_async_session) # Not needed if service handles persistence
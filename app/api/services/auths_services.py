@@ -1,33 +1,41 @@
 # app/api/services/auths_repositories.py (for imports)
 from app.api.repositories.auths_repositories import AuthRepository, get_auth_repository
-from app.utility.auth import get_password_hash, verify_password, create_access_token
+from app.utility.auth import get_password_hash, verify_and_update_password, create_access_token
 from app.schemas.models.users_models import User
 from fastapi import Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 
 class AuthService:
     def __init__(self, auth_repo: AuthRepository):
         self.auth_repo = auth_repo
 
     async def register_user(self, user_create_dto) -> User:
-        existing_user = await self.auth_repo.get_user_by_username_or_email(
-            user_create_dto.username, user_create_dto.email
-        )
-        if existing_user:
+        # Hashing is deliberately slow; keep it off the event loop
+        hashed_pw = await run_in_threadpool(get_password_hash, user_create_dto.password)
+        # The plain-text password never enters the insert data
+        user_data = user_create_dto.model_dump(exclude={"password"})
+        user_data['password_hash'] = hashed_pw
+        # The insert itself detects duplicates, so there is no pre-check query
+        new_user = await self.auth_repo.create_user(user_data)
+        if new_user is None:
             raise HTTPException(
                 status_code=400,
                 detail="Username or email already registered"
             )
-        hashed_pw = get_password_hash(user_create_dto.password)
-        user_data = user_create_dto.dict()
-        user_data['password_hash'] = hashed_pw
-        # Remove plain text password from data dict if it exists
-        user_data.pop('password', None)
-        return await self.auth_repo.create_user(user_data)
+        return new_user
 
     async def authenticate_user(self, username: str, password: str) -> User | None:
         user = await self.auth_repo.get_user_by_username(username)
-        if not user or not verify_password(password, user.password_hash):
+        if not user:
+            return None
+        valid, new_hash = await run_in_threadpool(
+            verify_and_update_password, password, user.password_hash
+        )
+        if not valid:
             return None
+        if new_hash is not None:
+            # Stored with an outdated scheme or cost; upgrade it while we have the password
+            await self.auth_repo.update_password_hash(user, new_hash)
         return user
 
     def create_token_for_user(self, user: User) -> dict:
@@ -1,12 +1,24 @@
 # app/api/services/collections_services.py
-from fastapi import Depends, HTTPException, status
+from typing import AsyncIterator
+from datetime import datetime
+from fastapi import Depends, HTTPException
 from typing import Optional
 from app.api.repositories.collections_repositories import (
     CollectionRepository,
     get_collection_repository,
 )
 from app.schemas.models.collections_models import Collection
-from app.schemas.contracts.collections_dtos import CollectionCreate
+from app.schemas.contracts.collections_dtos import CollectionCreate, CollectionOutList
+from app.schemas.contracts.search_dtos import SearchCount
+from app.utility.cache import (
+    LIST_CACHE_TTL,
+    SEARCH_CACHE_TTL,
+    bump_user_generation,
+    cached_count,
+    cached_rows,
+    list_cache_key,
+    search_cache_key,
+)
 
 
 class CollectionService:
@@ -16,7 +28,18 @@ class CollectionService:
     async def get_user_collections(
         self, user_id: int, type_filter: str | None = None
     ) -> list[Collection]:
-        return await self.collection_repo.get_collections_by_user(user_id, type_filter)
+        """List the user's collections; served from the list cache until the user's next write."""
+        return await cached_rows(
+            await list_cache_key("collections", user_id, type_filter),
+            lambda: self.collection_repo.get_collections_by_user(user_id, type_filter),
+            CollectionOutList,
+            ttl=LIST_CACHE_TTL,
+        )
+
+    def stream_user_collections(
+        self, user_id: int, type_filter: str | None = None
+    ) -> AsyncIterator[Collection]:
+        return self.collection_repo.stream_collections_by_user(user_id, type_filter)
 
     async def get_user_collection_by_id(
         self, user_id: int, collection_id: int, preload_items: bool = False
@@ -35,38 +58,24 @@ class CollectionService:
     async def create_collection_for_user(
         self, user_id: int, collection_create: CollectionCreate
     ) -> Collection:
-        existing = await self.collection_repo.get_collection_by_title_and_user(
-            collection_create.title, user_id
-        )
-        if existing:
+        data = collection_create.model_dump(exclude={"tag_ids"})
+        tag_ids = collection_create.tag_ids
+        data["user_id"] = user_id
+
+        # Duplicate titles are rejected by the INSERT itself (ON CONFLICT DO NOTHING)
+        new_collection = await self.collection_repo.create_collection_if_unique(data)
+        if new_collection is None:
             raise HTTPException(
                 status_code=400,
                 detail="Collection with this title already exists for the user",
             )
 
-        data = collection_create.dict()
-        tag_ids = data.pop("tag_ids", None)
-        data["user_id"] = user_id
-
-        if tag_ids is not None:
-            found = await self.collection_repo.get_tags_by_ids_and_user(tag_ids, user_id)
-            if len(found) != len(set(tag_ids)):
-                found_ids = {t.id for t in found}
-                missing = sorted(set(tag_ids) - found_ids)
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Tags not found or not owned by user: {missing}",
-                )
-
-        new_collection = await self.collection_repo.create_collection(data)
-
         if tag_ids is not None:
+            # Validates ownership in the link INSERT itself; a 400 here leaves nothing committed
             await self.collection_repo.set_collection_tags(new_collection, tag_ids)
 
         await self.collection_repo.db.commit()
-        # Full refresh (grabs updated_at) + ensure tags are loaded
-        await self.collection_repo.db.refresh(new_collection)
-        await self.collection_repo.db.refresh(new_collection, attribute_names=["tags"])
+        await bump_user_generation(user_id)
         return new_collection
 
     async def update_user_collection(
@@ -74,36 +83,33 @@ class CollectionService:
     ) -> Collection:
         collection = await self.get_user_collection_by_id(user_id, collection_id)
 
-        if collection_update.title != collection.title:
-            dup = await self.collection_repo.get_collection_by_title_and_user(
-                collection_update.title, user_id
-            )
-            if dup:
-                raise HTTPException(
-                    status_code=400,
-                    detail="Collection with this title already exists for the user",
-                )
-
-        update_data = collection_update.dict(exclude_unset=True)
-        tag_ids_to_set = update_data.pop("tag_ids", None)
+        update_data = collection_update.model_dump(exclude={"tag_ids"}, exclude_unset=True)
+        tag_ids_to_set = collection_update.tag_ids
 
-        await self.collection_repo.update_collection(collection, update_data)
+        # The UPDATE only matches when no other collection of the user has the new title
+        updated = await self.collection_repo.update_collection_if_unique(collection, update_data)
+        if updated is None:
+            # Only probed on this failure path: a concurrent delete is a 404, not a clash
+            if not await self.collection_repo.collection_exists(collection_id, user_id):
+                raise HTTPException(status_code=404, detail="Collection not found")
+            raise HTTPException(
+                status_code=400,
+                detail="Collection with this title already exists for the user",
+            )
 
         if tag_ids_to_set is not None:
             await self.collection_repo.set_collection_tags(collection, tag_ids_to_set)
 
         await self.collection_repo.db.commit()
-        # Full refresh + tags loaded so serialization never lazy-loads
-        await self.collection_repo.db.refresh(collection)
-        await self.collection_repo.db.refresh(collection, attribute_names=["tags"])
+        await bump_user_generation(user_id)
         return collection
 
     async def delete_user_collection(self, user_id: int, collection_id: int) -> None:
-        # Ensure the collection exists and belongs to the user
-        collection = await self.get_user_collection_by_id(user_id, collection_id)
-        # Deleting the collection will cascade to tasks/notes due to the model relationship config
-        await self.collection_repo.delete_collection(collection)  # repo deletes+flushes
+        # Bulk DELETEs scoped to the user's collection; nothing matched means 404
+        if not await self.collection_repo.delete_collection_by_id_and_user(collection_id, user_id):
+            raise HTTPException(status_code=404, detail="Collection not found")
         await self.collection_repo.db.commit()
+        await bump_user_generation(user_id)
 
 
     async def search_user_collections(
@@ -112,38 +118,62 @@ class CollectionService:
         query: str,
         type_filter: str | None = None,
         skip: int | None = None,
-        limit: int | None = None
+        limit: int | None = None,
+        after_updated_at: Optional[datetime] = None,
+        after_id: Optional[int] = None,
     ) -> list[Collection]:
         """
-        Service method to search collections for a user with validation.
+        Service method to search collections for a user.
 
         Args:
             user_id: The ID of the user.
-            query: The search term (required).
+            query: The search term, already trimmed and length-checked by `SearchQuery`.
             type_filter: Optional collection type filter (e.g., 'mixed', 'tasks-only').
+            skip: Number of results to skip.
+            limit: Maximum number of results to return.
+            after_updated_at: Optional keyset cursor (`updated_at` of the last seen row).
+            after_id: Optional keyset cursor (`id` of the last seen row).
 
         Returns:
-            A list of Collection ORM objects matching the search criteria.
-
-        Raises:
-            HTTPException: If the query is too short.
+            A list of Collection ORM objects matching the search criteria, or their
+            cached `CollectionOut` JSON form when the search cache is warm.
         """
-        # Basic validation
-        if not query or len(query.strip()) < 2: # Require at least 2 non-whitespace chars
-             raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Search query must be at least 2 characters long."
-            )
-
         # Delegate to the repository
-        collections = await self.collection_repo.search_collections(
-            user_id=user_id,
-            query=query.strip(), # Pass the stripped query
-            type_filter=type_filter,
-            skip=skip, 
-            limit=limit
+        return await cached_rows(
+            await search_cache_key(
+                "collections", user_id, query, type_filter, skip, limit, after_updated_at, after_id
+            ),
+            lambda: self.collection_repo.search_collections(
+                user_id=user_id,
+                query=query, # Pass the stripped query
+                type_filter=type_filter,
+                skip=skip,
+                limit=limit,
+                after_updated_at=after_updated_at,
+                after_id=after_id,
+            ),
+            CollectionOutList,
+            ttl=SEARCH_CACHE_TTL,
+        )
+
+    async def search_user_collections_with_count(
+        self, user_id: int, query: str, limit: int
+    ) -> tuple[list[Collection], SearchCount]:
+        """First `limit` matches plus their bounded count from one query; not cached here."""
+        collections, (count, exact) = await self.collection_repo.search_collections_with_count(user_id, query, limit)
+        return collections, SearchCount(count=count, exact=exact)
+
+    async def count_user_collections_search(
+        self,
+        user_id: int,
+        query: str,
+        type_filter: str | None = None,
+    ) -> SearchCount:
+        """Bounded match count for search_user_collections, cached like the result pages."""
+        return await cached_count(
+            await search_cache_key("collections:count", user_id, query, type_filter),
+            lambda: self.collection_repo.count_search_collections(user_id, query, type_filter),
         )
-        return list(collections)
 
 def get_collection_service(
     collection_repo: CollectionRepository = Depends(get_collection_repository),
@@ -1,14 +1,29 @@
 # app/api/services/notes_services.py
-from typing import Optional
-from fastapi import Depends, HTTPException, status
+from datetime import datetime
+from typing import AsyncIterator, Optional
+from fastapi import Depends, HTTPException
 from app.api.repositories.notes_repositories import (
     NoteRepository,
     get_note_repository,
 )
 from app.schemas.models.notes_models import Note
-from app.schemas.models.collections_models import Collection # Import Collection model
-from app.schemas.contracts.notes_dtos import NoteCreate, NoteBase
+from app.schemas.contracts.notes_dtos import NoteCreate, NoteBase, NoteOutList
+from app.schemas.contracts.search_dtos import SearchCount
 from app.schemas.enums.collections_types import CollectionType # Import the enum
+from app.utility.cache import (
+    LIST_CACHE_TTL,
+    SEARCH_CACHE_TTL,
+    bump_user_generation,
+    cached_count,
+    cached_rows,
+    list_cache_key,
+    search_cache_key,
+)
+
+# The column is Enum(CollectionType), so loaded values are the enum singletons
+_TASKS_ONLY = CollectionType.TASKS_ONLY
+_TASKS_ONLY_DETAIL = f"Cannot add a Note to a Collection of type '{_TASKS_ONLY.value}'."
+
 
 class NoteService:
     def __init__(self, note_repo: NoteRepository):
@@ -17,7 +32,18 @@ class NoteService:
     async def get_user_notes(
         self, user_id: int, collection_id: int | None = None
     ) -> list[Note]:
-        return await self.note_repo.get_notes_by_user(user_id=user_id, collection_id=collection_id)
+        """List the user's notes; served from the list cache until the user's next write."""
+        return await cached_rows(
+            await list_cache_key("notes", user_id, collection_id),
+            lambda: self.note_repo.get_notes_by_user(user_id=user_id, collection_id=collection_id),
+            NoteOutList,
+            ttl=LIST_CACHE_TTL,
+        )
+
+    def stream_user_notes(
+        self, user_id: int, collection_id: int | None = None
+    ) -> AsyncIterator[Note]:
+        return self.note_repo.stream_notes_by_user(user_id=user_id, collection_id=collection_id)
 
     async def get_user_note_by_id(self, user_id: int, note_id: int) -> Note:
         note = await self.note_repo.get_note_by_id_and_user(note_id, user_id)
@@ -26,42 +52,31 @@ class NoteService:
         return note
 
     async def create_note_for_user(self, user_id: int, note_create: NoteCreate) -> Note:
-        data = note_create.dict()
-        tag_ids = data.pop("tag_ids", None)
+        data = note_create.model_dump(exclude={"tag_ids"})
+        tag_ids = note_create.tag_ids
         data["user_id"] = user_id
 
         # Validate collection ownership AND type if provided
         if note_create.collection_id:
-            owned_collection: Collection = await self.note_repo.get_collection_by_id_and_user(note_create.collection_id, user_id) # Annotate type
-            if not owned_collection:
+            collection_type = await self.note_repo.get_collection_type_for_user(note_create.collection_id, user_id)
+            if collection_type is None:
                 raise HTTPException(
                     status_code=404, detail="Collection not found or not owned by user"
                 )
             # --- NEW TYPE CHECK ---
-            if owned_collection.type == CollectionType.TASKS_ONLY:
+            if collection_type is _TASKS_ONLY:
                  raise HTTPException(
-                    status_code=400, detail=f"Cannot add a Note to a Collection of type '{CollectionType.TASKS_ONLY.value}'."
+                    status_code=400, detail=_TASKS_ONLY_DETAIL
                 )
             # --- END NEW TYPE CHECK ---
 
-        # Validate tags if provided
-        if tag_ids is not None:
-            found = await self.note_repo.get_tags_by_ids_and_user(tag_ids, user_id)
-            if len(found) != len(set(tag_ids)):
-                found_ids = {t.id for t in found}
-                missing = sorted(set(tag_ids) - found_ids)
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Tags not found or not owned by user: {missing}",
-                )
-
         new_note = await self.note_repo.create_note(data)
         if tag_ids is not None:
+            # Validates ownership in the link INSERT itself; a 400 here leaves nothing committed
             await self.note_repo.set_note_tags(new_note, tag_ids)
 
         await self.note_repo.db.commit()
-        await self.note_repo.db.refresh(new_note)                         # full
-        await self.note_repo.db.refresh(new_note, attribute_names=["tags"])
+        await bump_user_generation(user_id)
         return new_note
 
     async def update_user_note(
@@ -69,8 +84,8 @@ class NoteService:
     ) -> Note:
         note = await self.get_user_note_by_id(user_id, note_id)
 
-        update_data = note_update.dict(exclude_unset=True)
-        tag_ids_to_set = update_data.pop("tag_ids", None)
+        update_data = note_update.model_dump(exclude={"tag_ids"}, exclude_unset=True)
+        tag_ids_to_set = note_update.tag_ids
 
         # Validate collection ownership AND type if changed/added
          # Check if collection_id is being set or changed (present in update_data)
@@ -78,50 +93,38 @@ class NoteService:
             # This covers setting to a new ID or explicitly setting to None
             new_collection_id = update_data["collection_id"]
             if new_collection_id: # If it's being set to a non-null ID
-                owned_collection: Collection = await self.note_repo.get_collection_by_id_and_user(
+                collection_type = await self.note_repo.get_collection_type_for_user(
                     new_collection_id, user_id
                 )
-                if not owned_collection:
+                if collection_type is None:
                     raise HTTPException(
                         status_code=404, detail="Collection not found or not owned by user"
                     )
                 # --- NEW TYPE CHECK ---
-                if owned_collection.type == CollectionType.TASKS_ONLY:
+                if collection_type is _TASKS_ONLY:
                     raise HTTPException(
-                        status_code=400, detail=f"Cannot add a Note to a Collection of type '{CollectionType.TASKS_ONLY.value}'."
+                        status_code=400, detail=_TASKS_ONLY_DETAIL
                     )
                 # --- END NEW TYPE CHECK ---
             # If new_collection_id is None, it's fine (removing from collection), so no check needed.
 
-        # Validate tags if provided
-        if tag_ids_to_set is not None:
-            found = await self.note_repo.get_tags_by_ids_and_user(tag_ids_to_set, user_id)
-            if len(found) != len(set(tag_ids_to_set)):
-                found_ids = {t.id for t in found}
-                missing = sorted(set(tag_ids_to_set) - found_ids)
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Tags not found or not owned by user: {missing}",
-                )
-
         # Apply changes
         if update_data:
             await self.note_repo.update_note(note, update_data)
         if tag_ids_to_set is not None:
+            # Rejects unknown/foreign tags itself; a 400 here leaves nothing committed
             await self.note_repo.set_note_tags(note, tag_ids_to_set)
 
         await self.note_repo.db.commit()
-        await self.note_repo.db.refresh(note)                              # full
-        await self.note_repo.db.refresh(note, attribute_names=["tags"])    # tags
+        await bump_user_generation(user_id)
         return note
 
     async def delete_user_note(self, user_id: int, note_id: int) -> None:
-        # Ensure the note exists and belongs to the user
-        note = await self.get_user_note_by_id(user_id, note_id)
-        # Delete via repository (repo currently deletes+flushes)
-        await self.note_repo.delete_note(note)
-        # Persist deletion
+        # One DELETE ... RETURNING both checks ownership and removes the note
+        if not await self.note_repo.delete_note_by_id_and_user(note_id, user_id):
+            raise HTTPException(status_code=404, detail="Note not found")
         await self.note_repo.db.commit()
+        await bump_user_generation(user_id)
 
     async def search_user_notes(
         self,
@@ -129,38 +132,60 @@ class NoteService:
         query: str,
         collection_id: Optional[int] = None,
         skip: int | None = None,
-        limit: int | None = None
+        limit: int | None = None,
+        after_updated_at: Optional[datetime] = None,
+        after_id: Optional[int] = None,
     ) -> list[Note]:
         """
-        Service method to search notes for a user with validation.
+        Service method to search notes for a user.
 
         Args:
             user_id: The ID of the user.
-            query: The search term (required).
+            query: The search term, already trimmed and length-checked by `SearchQuery`.
             collection_id: Optional collection ID filter.
+            skip: Number of results to skip.
+            limit: Maximum number of results to return.
+            after_updated_at: Optional keyset cursor (`updated_at` of the last seen row).
+            after_id: Optional keyset cursor (`id` of the last seen row).
 
         Returns:
-            A list of Note ORM objects matching the search criteria.
-
-        Raises:
-            HTTPException: If the query is too short.
+            A list of Note ORM objects matching the search criteria, or their
+            cached `NoteOut` JSON form when the search cache is warm.
         """
-        # Basic validation
-        if not query or len(query.strip()) < 2: # Require at least 2 non-whitespace chars
-             raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Search query must be at least 2 characters long."
-            )
-
         # Delegate to the repository
-        notes = await self.note_repo.search_notes(
-            user_id=user_id,
-            query=query.strip(), # Pass the stripped query
-            collection_id=collection_id,
-            skip=skip, 
-            limit=limit
+        return await cached_rows(
+            await search_cache_key("notes", user_id, query, collection_id, skip, limit, after_updated_at, after_id),
+            lambda: self.note_repo.search_notes(
+                user_id=user_id,
+                query=query, # Pass the stripped query
+                collection_id=collection_id,
+                skip=skip,
+                limit=limit,
+                after_updated_at=after_updated_at,
+                after_id=after_id,
+            ),
+            NoteOutList,
+            ttl=SEARCH_CACHE_TTL,
+        )
+
+    async def search_user_notes_with_count(
+        self, user_id: int, query: str, limit: int
+    ) -> tuple[list[Note], SearchCount]:
+        """First `limit` matches plus their bounded count from one query; not cached here."""
+        notes, (count, exact) = await self.note_repo.search_notes_with_count(user_id, query, limit)
+        return notes, SearchCount(count=count, exact=exact)
+
+    async def count_user_notes_search(
+        self,
+        user_id: int,
+        query: str,
+        collection_id: int | None = None,
+    ) -> SearchCount:
+        """Bounded match count for search_user_notes, cached like the result pages."""
+        return await cached_count(
+            await search_cache_key("notes:count", user_id, query, collection_id),
+            lambda: self.note_repo.count_search_notes(user_id, query, collection_id),
         )
-        return list(notes)
 
 def get_note_service(note_repo: NoteRepository = Depends(get_note_repository)) -> NoteService:
     return NoteService(note_repo)
@@ -1,19 +1,25 @@
 # app/api/services/search_services.py
 import asyncio
 from typing import Dict, Any, List # Add List
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends
 
 # Import services we depend on
+from app.api.repositories.collections_repositories import CollectionRepository
+from app.api.repositories.notes_repositories import NoteRepository
+from app.api.repositories.tags_repositories import TagRepository
+from app.api.repositories.tasks_repositories import TaskRepository
 from app.api.services.tasks_services import TaskService, get_task_service
 from app.api.services.notes_services import NoteService, get_note_service
 from app.api.services.collections_services import CollectionService, get_collection_service
 from app.api.services.tags_services import TagService, get_tag_service
+from app.schemas.database import IS_SQLITE, AsyncLocalSession
+from app.utility.cache import SEARCH_CACHE_TTL, cache_get, cache_set, cacheable_rows, search_cache_key
 
 # Import DTOs for serialization (This is the key addition!)
-from app.schemas.contracts.tasks_dtos import TaskOut
-from app.schemas.contracts.notes_dtos import NoteOut
-from app.schemas.contracts.collections_dtos import CollectionOut
-from app.schemas.contracts.tags_dtos import TagOut
+from app.schemas.contracts.tasks_dtos import TaskOutList
+from app.schemas.contracts.notes_dtos import NoteOutList
+from app.schemas.contracts.collections_dtos import CollectionOutList
+from app.schemas.contracts.tags_dtos import TagOutList
 
 # Import ORM models if needed for isinstance checks (optional here, but good practice if logic gets complex)
 # from app.schemas.models.tasks_models import Task
@@ -21,6 +27,7 @@ from app.schemas.contracts.tags_dtos import TagOut
 # from app.schemas.models.collections_models import Collection
 # from app.schemas.models.tags_models import Tag
 
+
 class SearchService:
     """
     Service to perform a global search across Tasks, Notes, Collections, and Tags.
@@ -38,6 +45,54 @@ class SearchService:
         self.collection_service = collection_service
         self.tag_service = tag_service
 
+    async def _run_searches(self, user_id: int, query: str, limit: int) -> tuple:
+        """Run the four per-type searches, concurrently where the database allows it.
+
+        Each search returns `(first `limit` rows, bounded SearchCount)` from a
+        single statement, so the page is cut by SQL `LIMIT` and the total comes
+        from a capped `COUNT` instead of hydrating every match.
+
+        An AsyncSession cannot run two statements at once, so on server
+        databases each search gets its own pooled session (the rows come back
+        detached, which is fine for serialization); size DB_POOL_SIZE for four
+        connections per in-flight global search. SQLite serializes on its
+        single file anyway, so there they run one after the other on the
+        request session.
+        """
+        def tasks(service: TaskService):
+            return service.search_user_tasks_with_count(user_id, query, limit)
+
+        def notes(service: NoteService):
+            return service.search_user_notes_with_count(user_id, query, limit)
+
+        def collections(service: CollectionService):
+            return service.search_user_collections_with_count(user_id, query, limit)
+
+        def tags(service: TagService):
+            return service.search_user_tags_with_count(user_id, query, limit)
+
+        if IS_SQLITE:
+            return (
+                await tasks(self.task_service),
+                await notes(self.note_service),
+                await collections(self.collection_service),
+                await tags(self.tag_service),
+            )
+
+        async def on_own_session(search):
+            async with AsyncLocalSession() as session:
+                return await search(session)
+
+        # TaskGroup cancels the sibling searches as soon as one fails
+        async with asyncio.TaskGroup() as tg:
+            branches = (
+                tg.create_task(on_own_session(lambda db: tasks(TaskService(TaskRepository(db))))),
+                tg.create_task(on_own_session(lambda db: notes(NoteService(NoteRepository(db))))),
+                tg.create_task(on_own_session(lambda db: collections(CollectionService(CollectionRepository(db))))),
+                tg.create_task(on_own_session(lambda db: tags(TagService(TagRepository(db))))),
+            )
+        return tuple(branch.result() for branch in branches)
+
     async def global_search(
         self, user_id: int, query: str, limit_per_type: int = 20
     ) -> Dict[str, Any]:
@@ -46,62 +101,46 @@ class SearchService:
 
         Args:
             user_id: The ID of the authenticated user.
-            query: The search term.
+            query: The search term, already trimmed and length-checked by `SearchQuery`.
             limit_per_type: Maximum number of results to return per entity type.
 
         Returns:
-            A dictionary containing the search results and metadata.
+            A dictionary containing the search results and metadata. `total_count`
+            sums the per-type match counts, each capped like the `/count`
+            endpoints; `total_count_exact` is false when a cap was hit. Served
+            from the search cache until the user's next write.
         """
-        # Basic validation
-        if not query or len(query.strip()) < 2:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Search query must be at least 2 characters long."
-            )
+        cache_key = await search_cache_key("global", user_id, query, limit_per_type)
+        if cache_key is not None:
+            cached = await cache_get(cache_key)
+            if cached is not None:
+                return cached
+
+        (
+            (tasks_results, tasks_count),
+            (notes_results, notes_count),
+            (collections_results, collections_count),
+            (tags_results, tags_count),
+        ) = await self._run_searches(user_id, query, limit_per_type)
+        counts = (tasks_count, notes_count, collections_count, tags_count)
 
-        stripped_query = query.strip()
-
-        tasks_results, notes_results, collections_results, tags_results = await asyncio.gather(
-            self.task_service.search_user_tasks(user_id, stripped_query, None, None, None),
-            self.note_service.search_user_notes(user_id, stripped_query, None),
-            self.collection_service.search_user_collections(user_id, stripped_query, None),
-            self.tag_service.search_user_tags(user_id, stripped_query),
-        )
-
-        # --- Apply limit per type ---
-        limited_tasks_orm = tasks_results[:limit_per_type]
-        limited_notes_orm = notes_results[:limit_per_type]
-        limited_collections_orm = collections_results[:limit_per_type]
-        limited_tags_orm = tags_results[:limit_per_type]
-
-        # --- Convert ORM objects to DTOs for serialization ---
-        # This is the crucial step that was missing!
-        limited_tasks_dto = [TaskOut.model_validate(task) for task in limited_tasks_orm]
-        limited_notes_dto = [NoteOut.model_validate(note) for note in limited_notes_orm]
-        limited_collections_dto = [CollectionOut.model_validate(collection) for collection in limited_collections_orm]
-        limited_tags_dto = [TagOut.model_validate(tag) for tag in limited_tags_orm]
-
-        # --- Calculate total count ---
-        total_count = (
-            len(tasks_results) +
-            len(notes_results) +
-            len(collections_results) +
-            len(tags_results)
-        )
-
-        # --- Construct the response with DTOs ---
-        return {
-            "query": stripped_query,
+        # --- Serialize each type once; the dicts serve both the response and the cache ---
+        response = {
+            "query": query,
             "results": {
-                "tasks": limited_tasks_dto,        # Use DTOs
-                "notes": limited_notes_dto,        # Use DTOs
-                "collections": limited_collections_dto, # Use DTOs
-                "tags": limited_tags_dto,          # Use DTOs
+                "tasks": cacheable_rows(TaskOutList, tasks_results),
+                "notes": cacheable_rows(NoteOutList, notes_results),
+                "collections": cacheable_rows(CollectionOutList, collections_results),
+                "tags": cacheable_rows(TagOutList, tags_results),
             },
-            "total_count": total_count,
+            "total_count": sum(c.count for c in counts),
+            "total_count_exact": all(c.exact for c in counts),
             # Future hook for relevance scores (if added later)
             # "relevance_scores": { ... }
         }
+        if cache_key is not None:
+            await cache_set(cache_key, response, ttl=SEARCH_CACHE_TTL)
+        return response
 
 # Dependency function to inject the SearchService
 def get_search_service(
@@ -1,15 +1,33 @@
 # app/api/services/tags_services.py
+from datetime import datetime
+from typing import Optional
 from app.api.repositories.tags_repositories import TagRepository, get_tag_repository
 from app.schemas.models.tags_models import Tag
-from app.schemas.contracts.tags_dtos import TagCreate
-from fastapi import Depends, HTTPException, status
+from app.schemas.contracts.tags_dtos import TagCreate, TagOutList
+from app.schemas.contracts.search_dtos import SearchCount
+from app.utility.cache import (
+    LIST_CACHE_TTL,
+    SEARCH_CACHE_TTL,
+    bump_user_generation,
+    cached_count,
+    cached_rows,
+    list_cache_key,
+    search_cache_key,
+)
+from fastapi import Depends, HTTPException
 
 class TagService:
     def __init__(self, tag_repo: TagRepository):
         self.tag_repo = tag_repo
 
     async def get_user_tags(self, user_id: int) -> list[Tag]:
-        return await self.tag_repo.get_tags_by_user(user_id)
+        """List the user's tags; served from the list cache until the user's next write."""
+        return await cached_rows(
+            await list_cache_key("tags", user_id),
+            lambda: self.tag_repo.get_tags_by_user(user_id),
+            TagOutList,
+            ttl=LIST_CACHE_TTL,
+        )
 
     async def get_user_tag_by_id(self, user_id: int, tag_id: int) -> Tag:
         tag = await self.tag_repo.get_tag_by_id_and_user(tag_id, user_id)
@@ -19,20 +37,17 @@ class TagService:
 
     async def create_tag_for_user(self, user_id: int, tag_create: TagCreate) -> Tag:
         # Prevent duplicate tag titles per user
-        existing_tag = await self.tag_repo.get_tag_by_title_and_user(
-            tag_create.title, user_id
-        )
-        if existing_tag:
+        if await self.tag_repo.tag_title_exists(tag_create.title, user_id):
             raise HTTPException(
                 status_code=400,
                 detail="Tag with this title already exists for the user"
             )
 
-        tag_data = tag_create.dict()
+        tag_data = tag_create.model_dump()
         tag_data['user_id'] = user_id
         tag = await self.tag_repo.create_tag(tag_data)
         await self.tag_repo.db.commit()
-        await self.tag_repo.db.refresh(tag)
+        await bump_user_generation(user_id)
         return tag
 
     async def update_user_tag(
@@ -46,10 +61,7 @@ class TagService:
 
         # Check for duplicate title (excluding the current tag)
         if tag_update.title != tag.title:
-            existing_tag = await self.tag_repo.get_tag_by_title_and_user(
-                tag_update.title, user_id
-            )
-            if existing_tag:
+            if await self.tag_repo.tag_title_exists(tag_update.title, user_id):
                 raise HTTPException(
                     status_code=400,
                     detail="Tag with this title already exists for the user"
@@ -57,7 +69,7 @@ class TagService:
 
         tag = await self.tag_repo.update_tag(tag, tag_update.title)  # flush()
         await self.tag_repo.db.commit()
-        await self.tag_repo.db.refresh(tag)
+        await bump_user_generation(user_id)
         return tag
     
 
@@ -65,42 +77,64 @@ class TagService:
         tag = await self.get_user_tag_by_id(user_id, tag_id)
         await self.tag_repo.delete_tag(tag)
         await self.tag_repo.db.commit()
+        await bump_user_generation(user_id)
 
     async def search_user_tags(
         self,
         user_id: int,
         query: str,
         skip: int | None = None,
-        limit: int | None = None
+        limit: int | None = None,
+        after_updated_at: Optional[datetime] = None,
+        after_id: Optional[int] = None,
     ) -> list[Tag]:
         """
-        Service method to search tags for a user with validation.
+        Service method to search tags for a user.
 
         Args:
             user_id: The ID of the user.
-            query: The search term (required).
+            query: The search term, already trimmed and length-checked by `SearchQuery`.
+            skip: Number of results to skip.
+            limit: Maximum number of results to return.
+            after_updated_at: Optional keyset cursor (`updated_at` of the last seen row).
+            after_id: Optional keyset cursor (`id` of the last seen row).
 
         Returns:
-            A list of Tag ORM objects matching the search criteria.
-
-        Raises:
-            HTTPException: If the query is too short.
+            A list of Tag ORM objects matching the search criteria, or their
+            cached `TagOut` JSON form when the search cache is warm.
         """
-        # Basic validation
-        if not query or len(query.strip()) < 2: # Require at least 2 non-whitespace chars
-             raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Search query must be at least 2 characters long."
-            )
-
         # Delegate to the repository
-        tags = await self.tag_repo.search_tags(
-            user_id=user_id,
-            query=query.strip(), 
-            skip=skip, 
-            limit=limit
+        return await cached_rows(
+            await search_cache_key("tags", user_id, query, skip, limit, after_updated_at, after_id),
+            lambda: self.tag_repo.search_tags(
+                user_id=user_id,
+                query=query,
+                skip=skip,
+                limit=limit,
+                after_updated_at=after_updated_at,
+                after_id=after_id,
+            ),
+            TagOutList,
+            ttl=SEARCH_CACHE_TTL,
+        )
+
+    async def search_user_tags_with_count(
+        self, user_id: int, query: str, limit: int
+    ) -> tuple[list[Tag], SearchCount]:
+        """First `limit` matches plus their bounded count from one query; not cached here."""
+        tags, (count, exact) = await self.tag_repo.search_tags_with_count(user_id, query, limit)
+        return tags, SearchCount(count=count, exact=exact)
+
+    async def count_user_tags_search(
+        self,
+        user_id: int,
+        query: str,
+    ) -> SearchCount:
+        """Bounded match count for search_user_tags, cached like the result pages."""
+        return await cached_count(
+            await search_cache_key("tags:count", user_id, query),
+            lambda: self.tag_repo.count_search_tags(user_id, query),
         )
-        return list(tags)
 
 # Dependency
 def get_tag_service(
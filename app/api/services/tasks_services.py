@@ -1,14 +1,29 @@
 # app/api/services/tasks_services.py
-from typing import Optional
-from fastapi import Depends, HTTPException, status
+from datetime import datetime
+from typing import AsyncIterator, Optional
+from fastapi import Depends, HTTPException
 from app.api.repositories.tasks_repositories import (
     TaskRepository,
     get_task_repository,
 )
 from app.schemas.models.tasks_models import Task
-from app.schemas.models.collections_models import Collection # Import Collection model
-from app.schemas.contracts.tasks_dtos import TaskCreate, TaskBase
+from app.schemas.contracts.tasks_dtos import TaskCreate, TaskBase, TaskOutList
+from app.schemas.contracts.search_dtos import SearchCount
 from app.schemas.enums.collections_types import CollectionType # Import the enum
+from app.utility.cache import (
+    LIST_CACHE_TTL,
+    SEARCH_CACHE_TTL,
+    bump_user_generation,
+    cached_count,
+    cached_rows,
+    list_cache_key,
+    search_cache_key,
+)
+
+# The column is Enum(CollectionType), so loaded values are the enum singletons
+_NOTES_ONLY = CollectionType.NOTES_ONLY
+_NOTES_ONLY_DETAIL = f"Cannot add a Task to a Collection of type '{_NOTES_ONLY.value}'."
+
 
 class TaskService:
     def __init__(self, task_repo: TaskRepository):
@@ -21,7 +36,27 @@ class TaskService:
         priority: str | None = None,
         collection_id: int | None = None,
     ) -> list[Task]:
-        return await self.task_repo.get_tasks_by_user(
+        """List the user's tasks; served from the list cache until the user's next write."""
+        return await cached_rows(
+            await list_cache_key("tasks", user_id, status, priority, collection_id),
+            lambda: self.task_repo.get_tasks_by_user(
+                user_id=user_id,
+                status=status,
+                priority=priority,
+                collection_id=collection_id,
+            ),
+            TaskOutList,
+            ttl=LIST_CACHE_TTL,
+        )
+
+    def stream_user_tasks(
+        self,
+        user_id: int,
+        status: str | None = None,
+        priority: str | None = None,
+        collection_id: int | None = None,
+    ) -> AsyncIterator[Task]:
+        return self.task_repo.stream_tasks_by_user(
             user_id=user_id,
             status=status,
             priority=priority,
@@ -35,46 +70,35 @@ class TaskService:
         return task
 
     async def create_task_for_user(self, user_id: int, task_create: TaskCreate) -> Task:
-        data = task_create.dict()
-        tag_ids = data.pop("tag_ids", None)
+        data = task_create.model_dump(exclude={"tag_ids"})
+        tag_ids = task_create.tag_ids
         data["user_id"] = user_id
 
         # Validate collection ownership AND type if provided
         if task_create.collection_id:
-            owned_collection: Collection = await self.task_repo.get_collection_by_id_and_user( # Annotate type
+            collection_type = await self.task_repo.get_collection_type_for_user(
                 task_create.collection_id, user_id
             )
-            if not owned_collection:
+            if collection_type is None:
                 raise HTTPException(
                     status_code=404, detail="Collection not found or not owned by user"
                 )
             # --- NEW TYPE CHECK ---
-            if owned_collection.type == CollectionType.NOTES_ONLY:
+            if collection_type is _NOTES_ONLY:
                  raise HTTPException(
-                    status_code=400, detail=f"Cannot add a Task to a Collection of type '{CollectionType.NOTES_ONLY.value}'."
+                    status_code=400, detail=_NOTES_ONLY_DETAIL
                 )
             # --- END NEW TYPE CHECK ---
 
-        # Validate tags if provided
-        if tag_ids is not None:
-            found = await self.task_repo.get_tags_by_ids_and_user(tag_ids, user_id)
-            if len(found) != len(set(tag_ids)):
-                found_ids = {t.id for t in found}
-                missing = sorted(set(tag_ids) - found_ids)
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Tags not found or not owned by user: {missing}",
-                )
-
         # Create & set tags
         new_task = await self.task_repo.create_task(data)
         if tag_ids is not None:
+            # Validates ownership in the link INSERT itself; a 400 here leaves nothing committed
             await self.task_repo.set_task_tags(new_task, tag_ids)
 
-        # One commit, then FULL refresh, then targeted refresh for tags
+        # One commit; RETURNING already filled the row and tags are set in-session
         await self.task_repo.db.commit()
-        await self.task_repo.db.refresh(new_task)                       # full refresh (timestamps, etc.)
-        await self.task_repo.db.refresh(new_task, attribute_names=["tags"])  # ensure tags loaded for tag_ids property
+        await bump_user_generation(user_id)
         return new_task
 
     async def update_user_task(
@@ -82,8 +106,8 @@ class TaskService:
     ) -> Task:
         task = await self.get_user_task_by_id(user_id, task_id)
 
-        update_data = task_update.dict(exclude_unset=True)
-        tag_ids_to_set = update_data.pop("tag_ids", None)
+        update_data = task_update.model_dump(exclude={"tag_ids"}, exclude_unset=True)
+        tag_ids_to_set = task_update.tag_ids
 
         # Validate collection ownership AND type if changed/added
         # Check if collection_id is being set or changed (present in update_data)
@@ -91,51 +115,39 @@ class TaskService:
              # This covers setting to a new ID or explicitly setting to None
             new_collection_id = update_data["collection_id"]
             if new_collection_id: # If it's being set to a non-null ID
-                owned_collection: Collection = await self.task_repo.get_collection_by_id_and_user(
+                collection_type = await self.task_repo.get_collection_type_for_user(
                     new_collection_id, user_id
                 )
-                if not owned_collection:
+                if collection_type is None:
                     raise HTTPException(
                         status_code=404, detail="Collection not found or not owned by user"
                     )
                  # --- NEW TYPE CHECK ---
-                if owned_collection.type == CollectionType.NOTES_ONLY:
+                if collection_type is _NOTES_ONLY:
                     raise HTTPException(
-                        status_code=400, detail=f"Cannot add a Task to a Collection of type '{CollectionType.NOTES_ONLY.value}'."
+                        status_code=400, detail=_NOTES_ONLY_DETAIL
                     )
                 # --- END NEW TYPE CHECK ---
             # If new_collection_id is None, it's fine (removing from collection), so no check needed.
 
-        # Validate tags if provided
-        if tag_ids_to_set is not None:
-            found = await self.task_repo.get_tags_by_ids_and_user(tag_ids_to_set, user_id)
-            if len(found) != len(set(tag_ids_to_set)):
-                found_ids = {t.id for t in found}
-                missing = sorted(set(tag_ids_to_set) - found_ids)
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Tags not found or not owned by user: {missing}",
-                )
-
         # Apply changes
         if update_data:
             await self.task_repo.update_task(task, update_data)
         if tag_ids_to_set is not None:
+            # Rejects unknown/foreign tags itself; a 400 here leaves nothing committed
             await self.task_repo.set_task_tags(task, tag_ids_to_set)
 
-        # Commit once, then FULL refresh + tags refresh (prevents MissingGreenlet on updated_at/tag_ids)
+        # UPDATE ... RETURNING and the tag rewrite leave the object fully loaded
         await self.task_repo.db.commit()
-        await self.task_repo.db.refresh(task)                            # full
-        await self.task_repo.db.refresh(task, attribute_names=["tags"])  # tags
+        await bump_user_generation(user_id)
         return task
 
     async def delete_user_task(self, user_id: int, task_id: int) -> None:
-        # Ensure the task exists and belongs to the user
-        task = await self.get_user_task_by_id(user_id, task_id)
-        # Delete via repository (repo currently deletes+flushes)
-        await self.task_repo.delete_task(task)
-        # Persist deletion
+        # One DELETE ... RETURNING both checks ownership and removes the task
+        if not await self.task_repo.delete_task_by_id_and_user(task_id, user_id):
+            raise HTTPException(status_code=404, detail="Task not found")
         await self.task_repo.db.commit()
+        await bump_user_generation(user_id)
 
     async def search_user_tasks(
         self,
@@ -145,43 +157,68 @@ class TaskService:
         priority: Optional[str] = None,
         collection_id: Optional[int] = None,
         skip: int | None = None,
-        limit: int | None = None
+        limit: int | None = None,
+        after_updated_at: Optional[datetime] = None,
+        after_id: Optional[int] = None,
     ) -> list[Task]:
         """
-        Service method to search tasks for a user with validation.
+        Service method to search tasks for a user.
 
         Args:
             user_id: The ID of the user.
-            query: The search term (required).
+            query: The search term, already trimmed and length-checked by `SearchQuery`.
             status: Optional status filter.
             priority: Optional priority filter.
             collection_id: Optional collection ID filter.
+            skip: Number of results to skip.
+            limit: Maximum number of results to return.
+            after_updated_at: Optional keyset cursor (`updated_at` of the last seen row).
+            after_id: Optional keyset cursor (`id` of the last seen row).
 
         Returns:
-            A list of Task ORM objects matching the search criteria.
-
-        Raises:
-            HTTPException: If the query is too short.
+            A list of Task ORM objects matching the search criteria, or their
+            cached `TaskOut` JSON form when the search cache is warm.
         """
-        # Basic validation
-        if not query or len(query.strip()) < 2: # Require at least 2 non-whitespace chars
-             raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Search query must be at least 2 characters long."
-            )
-
         # Delegate to the repository
-        tasks = await self.task_repo.search_tasks(
-            user_id=user_id,
-            query=query.strip(), # Pass the stripped query
-            status=status,
-            priority=priority,
-            collection_id=collection_id,
-            skip=skip, 
-            limit=limit
+        return await cached_rows(
+            await search_cache_key(
+                "tasks", user_id, query, status, priority, collection_id, skip, limit, after_updated_at, after_id
+            ),
+            lambda: self.task_repo.search_tasks(
+                user_id=user_id,
+                query=query, # Pass the stripped query
+                status=status,
+                priority=priority,
+                collection_id=collection_id,
+                skip=skip,
+                limit=limit,
+                after_updated_at=after_updated_at,
+                after_id=after_id,
+            ),
+            TaskOutList,
+            ttl=SEARCH_CACHE_TTL,
         )
-        return list(tasks)
 
+    async def search_user_tasks_with_count(
+        self, user_id: int, query: str, limit: int
+    ) -> tuple[list[Task], SearchCount]:
+        """First `limit` matches plus their bounded count from one query; not cached here."""
+        tasks, (count, exact) = await self.task_repo.search_tasks_with_count(user_id, query, limit)
+        return tasks, SearchCount(count=count, exact=exact)
+
+    async def count_user_tasks_search(
+        self,
+        user_id: int,
+        query: str,
+        status: str | None = None,
+        priority: str | None = None,
+        collection_id: int | None = None,
+    ) -> SearchCount:
+        """Bounded match count for search_user_tasks, cached like the result pages."""
+        return await cached_count(
+            await search_cache_key("tasks:count", user_id, query, status, priority, collection_id),
+            lambda: self.task_repo.count_search_tasks(user_id, query, status, priority, collection_id),
+        )
 
 def get_task_service(task_repo: TaskRepository = Depends(get_task_repository)) -> TaskService:
     return TaskService(task_repo)
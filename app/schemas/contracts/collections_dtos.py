@@ -2,7 +2,7 @@
 # COLLECTIONS SCHEMAS
 # ======================
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
 from typing import List, Optional
 from datetime import datetime
 from app.schemas.enums.collections_types import CollectionType
@@ -28,10 +28,12 @@ class CollectionOut(CollectionBase):
     task_count: Optional[int] = 0
     note_count: Optional[int] = 0
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
+# Validates/serializes a whole list in one pydantic-core call
+CollectionOutList = TypeAdapter(List[CollectionOut])
+
 class CollectionWithItems(CollectionOut):
     tasks: List[TaskOut] = []
     notes: List[NoteOut] = []
@@ -2,7 +2,7 @@
 # NOTES SCHEMAS
 # ======================
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
 from typing import List, Optional
 from datetime import datetime
 from app.schemas.contracts.tags_dtos import TagOut
@@ -24,8 +24,10 @@ class NoteOut(NoteBase):
     updated_at: datetime
     tag_ids: List[int] = []
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
+
+# Validates/serializes a whole list in one pydantic-core call
+NoteOutList = TypeAdapter(List[NoteOut])
 
 class NoteWithTags(NoteOut):
     tags: List[TagOut] = []
@@ -0,0 +1,22 @@
+# ======================
+# SEARCH SCHEMAS
+# ======================
+
+from pydantic import BaseModel, Field, constr
+
+
+class SearchCount(BaseModel):
+    count: int = Field(..., ge=0, description="Number of matches, capped for very broad searches")
+    exact: bool = Field(..., description="False when more matches exist than `count` reports")
+
+
+class SearchQuery(BaseModel):
+    """The `q` parameter shared by every search endpoint, stripped and length-checked once.
+
+    Used as `search: SearchQuery = Depends()`; services receive `search.q` as-is.
+    """
+    # A single character matches nearly every row, whether as a word prefix
+    # (`a:*`) or an infix pattern, so the page and count would be the full list
+    q: constr(strip_whitespace=True, min_length=2) = Field(
+        ..., description="Search term (at least 2 characters after trimming)"
+    )
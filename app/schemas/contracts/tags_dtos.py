@@ -2,8 +2,9 @@
 # TAGS SCHEMAS
 # ======================
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
 from datetime import datetime
+from typing import List
 
 
 class TagBase(BaseModel):
@@ -18,6 +19,7 @@ class TagOut(TagBase):
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
+# Validates/serializes a whole list in one pydantic-core call
+TagOutList = TypeAdapter(List[TagOut])
@@ -2,7 +2,7 @@
 # TASKS SCHEMAS
 # ======================
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
 from typing import List, Optional
 from datetime import datetime
 from app.schemas.enums.tasks_priorities import TaskPriority
@@ -29,10 +29,12 @@ class TaskOut(TaskBase):
     updated_at: datetime
     tag_ids: List[int] = []
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
         
         
+# Validates/serializes a whole list in one pydantic-core call
+TaskOutList = TypeAdapter(List[TaskOut])
+
 class TaskWithTags(TaskOut):
     tags: List[TagOut] = []
 
@@ -2,7 +2,7 @@
 # USERS SCHEMAS
 # ======================
 
-from pydantic import BaseModel, Field, EmailStr
+from pydantic import BaseModel, ConfigDict, Field, EmailStr
 from typing import List, Optional
 from datetime import datetime
 from app.schemas.contracts.tags_dtos import TagOut
@@ -26,8 +26,7 @@ class UserOut(UserBase):
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        from_attributes = True  # SQLAlchemy ORM compatibility
+    model_config = ConfigDict(from_attributes=True)  # SQLAlchemy ORM compatibility
 
 
 class UserWithDetails(UserOut):
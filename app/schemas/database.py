@@ -1,22 +1,70 @@
 # app/schemas/database.py
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker
+from contextlib import AsyncExitStack
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine, AsyncSession
+import asyncio
+import logging
 import os
 from dotenv import load_dotenv
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.orm import configure_mappers
 
 Base = declarative_base()
+logger = logging.getLogger(__name__)
 
 load_dotenv()
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./data.db")
+IS_SQLITE = DATABASE_URL.startswith("sqlite")
 
-engine = create_async_engine(DATABASE_URL, echo=False, future=True)
+# Pool sizing for server databases (ignored for SQLite)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "20"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "40"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+# Set when connecting through PgBouncer in transaction mode, which cannot
+# keep asyncpg's per-connection prepared statements.
+DB_BEHIND_PGBOUNCER = os.getenv("DB_BEHIND_PGBOUNCER", "").lower() in ("1", "true", "yes")
+# Compiled-SQL cache entries per engine (SQLAlchemy's default is 500) and
+# prepared statements kept per asyncpg connection (default 100).
+DB_QUERY_CACHE_SIZE = int(os.getenv("DB_QUERY_CACHE_SIZE", "1200"))
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "512"))
+# Opt-in: seconds between background pings of idle pooled connections, which
+# then replace pool_pre_ping's ping on every checkout. 0 (default) keeps pre-ping.
+DB_KEEPALIVE_INTERVAL = int(os.getenv("DB_KEEPALIVE_INTERVAL", "0"))
 
-AsyncLocalSession = sessionmaker(
+
+def _engine_options() -> dict:
+    if IS_SQLITE:
+        return {"query_cache_size": DB_QUERY_CACHE_SIZE}
+    options = dict(
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_KEEPALIVE_INTERVAL <= 0,
+        query_cache_size=DB_QUERY_CACHE_SIZE,
+    )
+    if "+asyncpg" in DATABASE_URL:
+        statement_cache_size = 0 if DB_BEHIND_PGBOUNCER else DB_STATEMENT_CACHE_SIZE
+        options["connect_args"] = {
+            "statement_cache_size": statement_cache_size,
+            "prepared_statement_cache_size": statement_cache_size,
+        }
+    return options
+
+
+# No explicit poolclass: async engines default to AsyncAdaptedQueuePool, and
+# passing the sync QueuePool here would block the event loop.
+engine = create_async_engine(DATABASE_URL, echo=False, future=True, **_engine_options())
+
+# Repositories flush explicitly before they read back, and RETURNING fills
+# server defaults, so neither autoflush nor post-commit expiry is needed.
+AsyncLocalSession = async_sessionmaker(
     bind=engine,
     class_=AsyncSession,
     expire_on_commit=False,
+    autoflush=False,
 )
 
 async def get_async_session():
@@ -32,3 +80,55 @@ async def init_db():
 
     configure_mappers()  
 
+async def _ping():
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+
+async def warm_pool():
+    """Open `DB_POOL_SIZE` connections up front so first requests skip the connect cost."""
+    if IS_SQLITE:
+        return
+    await asyncio.gather(*(_ping() for _ in range(DB_POOL_SIZE)))
+
+
+async def keep_pool_alive():
+    """Ping the idle pooled connections every `DB_KEEPALIVE_INTERVAL` seconds.
+
+    Only runs when the interval is set, in which case pool_pre_ping is off. A
+    connection that fails its ping is invalidated by the pool; one that drops
+    between two pings still surfaces as an error on the request that gets it.
+    Runs until cancelled; returns at once for SQLite or when the interval is 0.
+    """
+    if IS_SQLITE or DB_KEEPALIVE_INTERVAL <= 0:
+        return
+    pool = engine.pool
+    while True:
+        await asyncio.sleep(DB_KEEPALIVE_INTERVAL)
+        # Each pinged connection stays checked out until the sweep ends, so the
+        # next checkout cannot hand it back whatever order the pool uses. The
+        # sweep stops once no idle connection is left, so it never opens one,
+        # and is bounded by the idle count it started with.
+        async with AsyncExitStack() as held:
+            for _ in range(pool.checkedin()):
+                if pool.checkedin() == 0:
+                    break
+                try:
+                    conn = await held.enter_async_context(engine.connect())
+                    await conn.execute(text("SELECT 1"))
+                except (DBAPIError, OSError) as exc:
+                    # The pool has already invalidated the connection.
+                    logger.warning("Keepalive ping failed: %s", exc)
+
+
+def pool_stats() -> dict:
+    """Connection pool counters for the health endpoint (empty for SQLite)."""
+    if IS_SQLITE:
+        return {}
+    pool = engine.pool
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+    }
@@ -0,0 +1,51 @@
+"""Add trigram search indexes
+
+Revision ID: 7b1e4c2a9f30
+Revises: 2c6de369d69d
+Create Date: 2025-09-20 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b1e4c2a9f30'
+down_revision: Union[str, Sequence[str], None] = '2c6de369d69d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (index name, table, column) for every column the search endpoints ILIKE on
+TRGM_INDEXES = [
+    ('ix_tasks_title_trgm', 'tasks', 'title'),
+    ('ix_tasks_description_trgm', 'tasks', 'description'),
+    ('ix_notes_title_trgm', 'notes', 'title'),
+    ('ix_notes_description_trgm', 'notes', 'description'),
+    ('ix_collections_title_trgm', 'collections', 'title'),
+    ('ix_tags_title_trgm', 'tags', 'title'),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # pg_trgm GIN indexes make `ILIKE '%q%'` index-seekable; other dialects keep scanning.
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, table, column in TRGM_INDEXES:
+        op.create_index(
+            name,
+            table,
+            [column],
+            postgresql_using='gin',
+            postgresql_ops={column: 'gin_trgm_ops'},
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    for name, table, _ in TRGM_INDEXES:
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,67 @@
+"""Add full-text search indexes
+
+Revision ID: a3c9e1f7b2d5
+Revises: f2b7d1e4a6c8
+Create Date: 2025-09-22 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3c9e1f7b2d5'
+down_revision: Union[str, Sequence[str], None] = 'f2b7d1e4a6c8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (index name, table, tsvector document); must match `_text_search` in
+# app/api/repositories/_utils.py exactly or the planner will not use the index
+TSV_INDEXES = [
+    ('ix_tasks_search_tsv', 'tasks',
+     "to_tsvector('simple', coalesce(title, '') || ' ' || coalesce(description, ''))"),
+    ('ix_notes_search_tsv', 'notes',
+     "to_tsvector('simple', coalesce(title, '') || ' ' || coalesce(description, ''))"),
+    ('ix_tags_search_tsv', 'tags',
+     "to_tsvector('simple', coalesce(title, ''))"),
+]
+
+# Trigram indexes from 7b1e4c2a9f30 that full-text search leaves unread; the
+# collections title one goes in b5d2e8f1c9a4, when collections switch over
+TRGM_INDEXES = [
+    ('ix_tasks_title_trgm', 'tasks', 'title'),
+    ('ix_tasks_description_trgm', 'tasks', 'description'),
+    ('ix_notes_title_trgm', 'notes', 'title'),
+    ('ix_notes_description_trgm', 'notes', 'description'),
+    ('ix_tags_title_trgm', 'tags', 'title'),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Expression GIN indexes for `to_tsvector(...) @@ to_tsquery(...)`; other dialects keep ILIKE.
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    for name, table, document in TSV_INDEXES:
+        op.create_index(name, table, [sa.text(document)], postgresql_using='gin')
+    # Only queries without word characters still ILIKE, and trigrams can't help those
+    for name, table, _ in TRGM_INDEXES:
+        op.drop_index(name, table_name=table)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    for name, table, column in TRGM_INDEXES:
+        op.create_index(
+            name,
+            table,
+            [column],
+            postgresql_using='gin',
+            postgresql_ops={column: 'gin_trgm_ops'},
+        )
+    for name, table, _ in TSV_INDEXES:
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,46 @@
+"""Add collections full-text search index
+
+Revision ID: b5d2e8f1c9a4
+Revises: a3c9e1f7b2d5
+Create Date: 2025-09-23 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5d2e8f1c9a4'
+down_revision: Union[str, Sequence[str], None] = 'a3c9e1f7b2d5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Collections search matches the title only; must match `_text_search` exactly
+INDEX_NAME = 'ix_collections_search_tsv'
+DOCUMENT = "to_tsvector('simple', coalesce(title, ''))"
+# The title trigram index from 7b1e4c2a9f30 is no longer read once this lands
+TRGM_INDEX_NAME = 'ix_collections_title_trgm'
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.create_index(INDEX_NAME, 'collections', [sa.text(DOCUMENT)], postgresql_using='gin')
+    op.drop_index(TRGM_INDEX_NAME, table_name='collections')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.create_index(
+        TRGM_INDEX_NAME,
+        'collections',
+        ['title'],
+        postgresql_using='gin',
+        postgresql_ops={'title': 'gin_trgm_ops'},
+    )
+    op.drop_index(INDEX_NAME, table_name='collections')
@@ -0,0 +1,36 @@
+"""Add task filter and collection membership indexes
+
+Revision ID: c7e3a9d2f1b6
+Revises: b5d2e8f1c9a4
+Create Date: 2025-09-24 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7e3a9d2f1b6'
+down_revision: Union[str, Sequence[str], None] = 'b5d2e8f1c9a4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (index name, table, columns); mirrors __table_args__ on Task and Note
+INDEXES = [
+    ('ix_tasks_user_id_status_updated_at', 'tasks', ['user_id', 'status', 'updated_at']),
+    ('ix_tasks_collection_id_user_id', 'tasks', ['collection_id', 'user_id']),
+    ('ix_notes_collection_id_user_id', 'notes', ['collection_id', 'user_id']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, table, _ in INDEXES:
+        op.drop_index(name, table_name=table)
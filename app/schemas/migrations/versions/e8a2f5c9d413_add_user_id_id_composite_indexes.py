@@ -0,0 +1,37 @@
+"""Add (user_id, id) composite indexes
+
+Revision ID: e8a2f5c9d413
+Revises: c41d8a6e2b57
+Create Date: 2025-09-20 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8a2f5c9d413'
+down_revision: Union[str, Sequence[str], None] = 'c41d8a6e2b57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ['tasks', 'notes', 'collections', 'tags']
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # INCLUDE is Postgres-only and ignored elsewhere; it lets list queries scan index-only.
+    for table in TABLES:
+        op.create_index(
+            f'ix_{table}_user_id_id',
+            table,
+            ['user_id', 'id'],
+            postgresql_include=['title', 'updated_at'],
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in TABLES:
+        op.drop_index(f'ix_{table}_user_id_id', table_name=table)
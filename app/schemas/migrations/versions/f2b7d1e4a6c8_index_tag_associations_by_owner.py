@@ -0,0 +1,38 @@
+"""Index tag associations by owner
+
+Revision ID: f2b7d1e4a6c8
+Revises: e8a2f5c9d413
+Create Date: 2025-09-21 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2b7d1e4a6c8'
+down_revision: Union[str, Sequence[str], None] = 'e8a2f5c9d413'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+OWNERS = ['task', 'note', 'collection']
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for owner in OWNERS:
+        op.create_index(
+            f'ix_tag_{owner}_association_{owner}_id_tag_id',
+            f'tag_{owner}_association',
+            [f'{owner}_id', 'tag_id'],
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for owner in OWNERS:
+        op.drop_index(
+            f'ix_tag_{owner}_association_{owner}_id_tag_id',
+            table_name=f'tag_{owner}_association',
+        )
@@ -1,6 +1,6 @@
 # app/schemas/models/collections_models.py
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Enum, UniqueConstraint
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Enum, UniqueConstraint, Index
+from sqlalchemy.orm import query_expression, relationship
 from sqlalchemy.sql import func
 from app.schemas.enums.collections_types import CollectionType
 from app.schemas.database import Base
@@ -24,12 +24,20 @@ class Collection(Base):
 
     __table_args__ = (
         UniqueConstraint('user_id', 'title', name='unique_user_collection_title'),
+        # Owner-scoped lookups seek (user_id, id) directly
+        Index("ix_collections_user_id_id", "user_id", "id", postgresql_include=["title", "updated_at"]),
     )
     
+    # Filled only by list/search queries that aggregate tag IDs in SQL
+    tag_id_list = query_expression()
+
     @property
     def tag_ids(self) -> list[int]:
+        if self.tag_id_list is not None:
+            return self.tag_id_list
         return [t.id for t in (self.tags or [])]
 
     def __repr__(self):
-        return f"<Collection(id={self.id}, title='{self.title}', type='{self.type}')>"
+        d = self.__dict__
+        return f"<Collection(id={d.get('id')}, title='{d.get('title')}', type='{d.get('type')}')>"
 
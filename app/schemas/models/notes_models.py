@@ -1,6 +1,6 @@
 # app/schemas/models/notes_models.py
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Index
+from sqlalchemy.orm import query_expression, relationship
 from sqlalchemy.sql import func
 from app.schemas.database import Base
 
@@ -18,12 +18,27 @@ class Note(Base):
     user = relationship("User", back_populates="notes")
     collection = relationship("Collection", back_populates="notes")
     tags = relationship("Tag", secondary="tag_note_association",
-                        back_populates="notes", lazy="selectin")
+                        back_populates="notes", lazy="raise_on_sql")
+
+    __table_args__ = (
+        # Owner-scoped lookups seek (user_id, id) directly
+        Index("ix_notes_user_id_id", "user_id", "id", postgresql_include=["title", "updated_at"]),
+        # Collection lookups (preload, bulk delete) and per-user collection filters
+        Index("ix_notes_collection_id_user_id", "collection_id", "user_id"),
+    )
+    # Fetch server-generated id/timestamps via RETURNING instead of a refresh
+    __mapper_args__ = {"eager_defaults": True}
+
+    # Filled only by list/search queries that aggregate tag IDs in SQL
+    tag_id_list = query_expression()
 
     @property
     def tag_ids(self) -> list[int]:
+        if self.tag_id_list is not None:
+            return self.tag_id_list
         return [t.id for t in (self.tags or [])]
 
     def __repr__(self):
-        return f"<Note(id={self.id}, title='{self.title}')>"
+        d = self.__dict__
+        return f"<Note(id={d.get('id')}, title='{d.get('title')}')>"
 
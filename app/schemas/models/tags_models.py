@@ -1,5 +1,5 @@
 # app/schemas/models/tags_models.py
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Table, UniqueConstraint
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Table, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.schemas.database import Base
@@ -14,6 +14,8 @@ tag_task_association = Table(
     Base.metadata,
     Column("tag_id", Integer, ForeignKey("tags.id"), primary_key=True),
     Column("task_id", Integer, ForeignKey("tasks.id"), primary_key=True),
+    # PK is (tag_id, task_id); lookups by owner need their own index
+    Index("ix_tag_task_association_task_id_tag_id", "task_id", "tag_id"),
 )
 
 # Association table: Tags <-> Notes
@@ -22,6 +24,8 @@ tag_note_association = Table(
     Base.metadata,
     Column("tag_id", Integer, ForeignKey("tags.id"), primary_key=True),
     Column("note_id", Integer, ForeignKey("notes.id"), primary_key=True),
+    # PK is (tag_id, note_id); lookups by owner need their own index
+    Index("ix_tag_note_association_note_id_tag_id", "note_id", "tag_id"),
 )
 
 # Association table: Tags <-> Collections
@@ -30,6 +34,8 @@ tag_collection_association = Table(
     Base.metadata,
     Column("tag_id", Integer, ForeignKey("tags.id"), primary_key=True),
     Column("collection_id", Integer, ForeignKey("collections.id"), primary_key=True),
+    # PK is (tag_id, collection_id); lookups by owner need their own index
+    Index("ix_tag_collection_association_collection_id_tag_id", "collection_id", "tag_id"),
 )
 
 # ================================================
@@ -52,8 +58,13 @@ class Tag(Base):
 
     __table_args__ = (
         UniqueConstraint('user_id', 'title', name='unique_user_tag_title'),
+        # Owner-scoped lookups seek (user_id, id) directly
+        Index("ix_tags_user_id_id", "user_id", "id", postgresql_include=["title", "updated_at"]),
     )
+    # Fetch server-generated id/timestamps via RETURNING instead of a refresh
+    __mapper_args__ = {"eager_defaults": True}
 
     def __repr__(self):
-        return f"<Tag(id={self.id}, title='{self.title}')>"
+        d = self.__dict__
+        return f"<Tag(id={d.get('id')}, title='{d.get('title')}')>"
 
@@ -1,6 +1,6 @@
 # app/schemas/models/tasks_models.py
-from sqlalchemy import Column, Integer, String, Text, DateTime, Enum, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Text, DateTime, Enum, ForeignKey, Index
+from sqlalchemy.orm import query_expression, relationship
 from sqlalchemy.sql import func
 from app.schemas.enums.tasks_priorities import TaskPriority
 from app.schemas.enums.tasks_status import TaskStatus
@@ -22,12 +22,31 @@ class Task(Base):
     user = relationship("User", back_populates="tasks")
     collection = relationship("Collection", back_populates="tasks")
     tags = relationship("Tag", secondary="tag_task_association",
-                        back_populates="tasks", lazy="selectin")
+                        back_populates="tasks", lazy="raise_on_sql")
+
+    __table_args__ = (
+        # Owner-scoped lookups seek (user_id, id) directly
+        Index("ix_tasks_user_id_id", "user_id", "id", postgresql_include=["title", "updated_at"]),
+        # Status-filtered listings, newest first
+        Index("ix_tasks_user_id_status_updated_at", "user_id", "status", "updated_at"),
+        # Collection lookups (preload, bulk delete) and per-user collection filters
+        Index("ix_tasks_collection_id_user_id", "collection_id", "user_id"),
+    )
+    # Fetch server-generated id/timestamps via RETURNING instead of a refresh
+    __mapper_args__ = {"eager_defaults": True}
+
+    # Filled only by list/search queries that aggregate tag IDs in SQL
+    tag_id_list = query_expression()
 
     @property
     def tag_ids(self) -> list[int]:
+        if self.tag_id_list is not None:
+            return self.tag_id_list
         return [t.id for t in (self.tags or [])]
 
     def __repr__(self):
-        return f"<Task(id={self.id}, title='{self.title}', status='{self.status}')>"
+        # Read loaded state directly: going through the attributes would refresh an
+        # expired instance, i.e. emit a SELECT (MissingGreenlet under asyncio)
+        d = self.__dict__
+        return f"<Task(id={d.get('id')}, title='{d.get('title')}', status='{d.get('status')}')>"
 
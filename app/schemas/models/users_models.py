@@ -1,6 +1,6 @@
 # app/schemas/models/users_models.py
-from sqlalchemy import Column, Integer, String, DateTime
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, DateTime, Index
+from sqlalchemy.orm import deferred, relationship
 from sqlalchemy.sql import func
 from app.schemas.database import Base
 
@@ -12,7 +12,10 @@ class User(Base):
     fname = Column(String(50), nullable=False)
     lname = Column(String(50), nullable=False)
     phone = Column(String(20), nullable=True)
-    password_hash = Column(String(255), nullable=False)
+    # Only login needs the hash; it loads via undefer_group("credentials")
+    password_hash = deferred(
+        Column(String(255), nullable=False), group="credentials", raiseload=True
+    )
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now(), server_default=func.now())
 
@@ -22,6 +25,15 @@ class User(Base):
     collections = relationship("Collection", back_populates="user", cascade="all, delete-orphan")
     tags = relationship("Tag", back_populates="user", cascade="all, delete-orphan")
 
+    # Case-insensitive uniqueness; also lets `lower(col) = lower(:x)` lookups seek
+    __table_args__ = (
+        Index("ix_users_username_lower", func.lower(username), unique=True),
+        Index("ix_users_email_lower", func.lower(email), unique=True),
+    )
+    # Fetch server-generated id/timestamps via RETURNING instead of a refresh
+    __mapper_args__ = {"eager_defaults": True}
+
     def __repr__(self):
-        return f"<User(id={self.id}, username='{self.username}')>"
+        d = self.__dict__
+        return f"<User(id={d.get('id')}, username='{d.get('username')}')>"
 
@@ -1,21 +1,35 @@
+import os
+import time
 from datetime import datetime, timedelta
-from typing import Optional
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Mapping, Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.future import select
+from app.api.repositories.auths_repositories import AuthRepository
 from app.schemas.database import get_async_session
-from app.schemas.models.users_models import User
-from sqlalchemy.future import select
+from app.schemas.contracts.users_dtos import UserOut
 
 # Config
 SECRET_KEY = "your_very_long_random_secret_key_here_1234567890abcdef"  # Load from env in prod!
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# argon2id for new hashes when the argon2-cffi backend is installed; bcrypt hashes
+# keep verifying and are re-hashed on the next successful login (see needs_update).
+try:
+    import argon2  # noqa: F401
+    _HASH_SCHEMES = ["argon2", "bcrypt"]
+except ImportError:
+    _HASH_SCHEMES = ["bcrypt"]
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+pwd_context = CryptContext(
+    schemes=_HASH_SCHEMES, deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS
+)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -24,6 +38,12 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
+def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, Optional[str]]:
+    """Verify a password; the second item is a replacement hash when the stored one is outdated."""
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
@@ -32,26 +52,42 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return encoded_jwt
 
 
+@lru_cache(maxsize=4096)
+def _decode_token(token: str) -> Mapping:
+    """Verify and decode a JWT once per distinct token.
+
+    Decoding is pure given SECRET_KEY, so repeat requests carrying the same
+    bearer token skip the HMAC check; invalid tokens raise and are not cached.
+    Expiry is re-checked by the caller because a cached payload outlives `exp`.
+    The payload is shared between requests, so it is returned read-only.
+
+    Caching a verified result is safe while SECRET_KEY is fixed for the life of
+    the process: rotating it means a restart, which empties this cache. Code
+    that ever swaps the key at runtime must call `_decode_token.cache_clear()`.
+    Tokens cannot be revoked before `exp` with or without the cache.
+    """
+    return MappingProxyType(jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM]))
+
+
 async def get_current_user(
     db: AsyncSession = Depends(get_async_session), 
     token: str = Depends(oauth2_scheme)
-) -> User: # Explicitly annotate return type
+) -> UserOut: # Explicitly annotate return type
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = _decode_token(token)
         user_id: str = payload.get("user_id")
-        if user_id is None:
+        if user_id is None or payload.get("exp", 0) <= time.time():
             raise credentials_exception
     except JWTError:
         raise credentials_exception
     
-    # This query should return a User INSTANCE
-    result = await db.execute(select(User).where(User.id == int(user_id))) 
-    user: User | None = result.scalar_one_or_none()
+    # Served from the user cache when warm; falls back to the DB
+    user: UserOut | None = await AuthRepository(db).get_user_by_id(int(user_id))
     if user is None:
         raise credentials_exception
     return user
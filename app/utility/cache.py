@@ -0,0 +1,141 @@
+# app/utility/cache.py
+import os
+from hashlib import blake2b
+from typing import Any, Awaitable, Callable, Optional
+
+import orjson
+from pydantic import TypeAdapter
+import redis.asyncio as redis
+from dotenv import load_dotenv
+from redis.exceptions import RedisError
+
+from app.schemas.contracts.search_dtos import SearchCount
+
+load_dotenv()
+REDIS_URL = os.getenv("REDIS_URL")
+
+# Caching is opt-in: without REDIS_URL every read is a miss and writes are no-ops.
+redis_client: Optional[redis.Redis] = redis.from_url(REDIS_URL) if REDIS_URL else None
+
+SEARCH_CACHE_TTL = 30
+LIST_CACHE_TTL = 60
+
+
+async def cache_get(key: str) -> Any | None:
+    """Return the JSON value stored at `key`, or None on a miss.
+
+    Redis being unreachable is treated as a miss so the caller falls back to the DB.
+    """
+    if redis_client is None:
+        return None
+    try:
+        raw = await redis_client.get(key)
+    except RedisError:
+        return None
+    return orjson.loads(raw) if raw is not None else None
+
+
+async def cache_set(key: str, value: Any, ttl: int) -> None:
+    """Store `value` as JSON under `key` for `ttl` seconds."""
+    if redis_client is None:
+        return
+    try:
+        await redis_client.set(key, orjson.dumps(value), ex=ttl)
+    except RedisError:
+        pass
+
+
+async def cache_delete(*keys: str) -> None:
+    if redis_client is None or not keys:
+        return
+    try:
+        await redis_client.delete(*keys)
+    except RedisError:
+        pass
+
+
+def _generation_key(user_id: int) -> str:
+    return f"user:{user_id}:gen"
+
+
+async def bump_user_generation(user_id: int) -> None:
+    """Invalidate every generation-scoped cache entry of a user in O(1).
+
+    Call after any create/update/delete of the user's collections, notes,
+    tasks or tags; old keys are simply never read again and expire by TTL.
+    """
+    if redis_client is None:
+        return
+    try:
+        await redis_client.incr(_generation_key(user_id))
+    except RedisError:
+        pass
+
+
+async def _generation_scoped_key(
+    prefix: str, endpoint: str, user_id: int, params: tuple
+) -> str | None:
+    if redis_client is None:
+        return None
+    try:
+        generation = await redis_client.get(_generation_key(user_id))
+    except RedisError:
+        return None
+    digest = blake2b("|".join(map(str, params)).encode(), digest_size=8).hexdigest()
+    return f"{prefix}:{endpoint}:{user_id}:{int(generation or 0)}:{digest}"
+
+
+async def search_cache_key(endpoint: str, user_id: int, *params: Any) -> str | None:
+    """Build `srch:{endpoint}:{user_id}:{generation}:{hash(params)}`, or None when caching is off."""
+    return await _generation_scoped_key("srch", endpoint, user_id, params)
+
+
+async def list_cache_key(endpoint: str, user_id: int, *params: Any) -> str | None:
+    """Build `list:{endpoint}:{user_id}:{generation}:{hash(params)}`, or None when caching is off."""
+    return await _generation_scoped_key("list", endpoint, user_id, params)
+
+
+def cacheable_rows(adapter: TypeAdapter, rows: Any) -> list:
+    """Turn ORM rows into the JSON-ready dicts stored in the cache, in one batch pass."""
+    return adapter.dump_python(adapter.validate_python(rows), mode="json")
+
+
+async def cached_rows(
+    key: str | None,
+    loader: Callable[[], Awaitable[Any]],
+    adapter: TypeAdapter,
+    ttl: int,
+) -> Any:
+    """Read-through cache for a list of ORM rows.
+
+    A hit returns the cached JSON-ready dicts. A miss awaits `loader()`,
+    stores its rows in `adapter`'s JSON form for `ttl` seconds and returns the
+    ORM rows. A None `key` (caching off) goes straight to the loader.
+    """
+    if key is not None:
+        cached = await cache_get(key)
+        if cached is not None:
+            return cached
+    rows = await loader()
+    if key is not None:
+        await cache_set(key, cacheable_rows(adapter, rows), ttl=ttl)
+    return rows
+
+
+async def cached_count(
+    key: str | None, loader: Callable[[], Awaitable[tuple[int, bool]]]
+) -> SearchCount:
+    """Read-through cache for a bounded `(count, exact)` search count.
+
+    Entries are stored as plain dicts for SEARCH_CACHE_TTL; a None `key`
+    (caching off) goes straight to the loader.
+    """
+    if key is not None:
+        cached = await cache_get(key)
+        if cached is not None:
+            return SearchCount(**cached)
+    count, exact = await loader()
+    result = SearchCount(count=count, exact=exact)
+    if key is not None:
+        await cache_set(key, result.model_dump(), ttl=SEARCH_CACHE_TTL)
+    return result
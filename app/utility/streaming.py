@@ -0,0 +1,22 @@
+# app/utility/streaming.py
+from typing import AsyncIterable, Type
+
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def ndjson_response(rows: AsyncIterable, dto: Type[BaseModel]) -> StreamingResponse:
+    """Stream ORM rows as newline-delimited JSON, one `dto` object per line.
+
+    Memory stays bounded by the producer's batch size instead of the full
+    result set, and the first bytes go out before the query finishes.
+    """
+    async def body():
+        # pydantic-core encodes each object straight to JSON; orjson would
+        # first need a model_dump() dict per row
+        async for row in rows:
+            yield dto.model_validate(row).model_dump_json() + "\n"
+
+    return StreamingResponse(body(), media_type=NDJSON_MEDIA_TYPE)
@@ -1,6 +1,11 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+
+import orjson
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from app.schemas.database import init_db
+from starlette.routing import Route
+from app.schemas.database import engine, init_db, keep_pool_alive, pool_stats, warm_pool
 from app.api.routers.auths_routers import router as auth_router
 from app.api.routers.tasks_routers import router as tasks_router
 from app.api.routers.notes_routers import router as notes_router
@@ -9,7 +14,21 @@ from app.api.routers.tags_routers import router as tags_router
 
 from app.api.routers.search_routers import router as search_router
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await init_db()
+    await warm_pool()
+    app.openapi()  # cached on the app, so the first /docs hit doesn't build it
+    keepalive = asyncio.create_task(keep_pool_alive())
+    try:
+        yield
+    finally:
+        keepalive.cancel()
+        await engine.dispose()  # close pooled connections instead of leaving them to GC
+
+
 app = FastAPI(
+    lifespan=lifespan,
     title="Task & Note Manager API",
     description="A powerful app to manage tasks and notes with collections and tags.",
     version="1.0.0",
@@ -22,6 +41,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Let browsers reuse a preflight for a day (Chromium caps this at 2h)
+    max_age=86400,
 )
 
 # Include routers
@@ -33,15 +54,23 @@ app.include_router(tags_router)
 
 app.include_router(search_router)
 
-@app.on_event("startup")
-async def on_startup():
-    await init_db()
+# Constant bodies, encoded once at import instead of per request
+_ROOT_BODY = orjson.dumps({"message": "Welcome to Task & Note Manager API 🚀"})
+_HEALTH_OK_BODY = orjson.dumps({"status": "ok"})
 
-@app.get("/")
+@app.get("/", response_model=None)
 def read_root():
-    return {"message": "Welcome to Task & Note Manager API 🚀"}
+    return Response(content=_ROOT_BODY, media_type="application/json")
+
+# Health check: a plain Starlette route, first in the table, so probes skip
+# FastAPI's dependency/validation wrapper entirely (not listed in the docs)
+async def health_check(request: Request) -> Response:
+    stats = pool_stats()
+    if stats:
+        return Response(
+            content=orjson.dumps({"status": "ok", "db_pool": stats}),
+            media_type="application/json",
+        )
+    return Response(content=_HEALTH_OK_BODY, media_type="application/json")
 
-# Health check
-@app.get("/health")
-async def health_check():
-    return {"status": "ok"}
+app.router.routes.insert(0, Route("/health", health_check, methods=["GET"]))
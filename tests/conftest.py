@@ -0,0 +1,49 @@
+import os
+import tempfile
+
+import pytest
+
+# Must be set before the app (and its engine) is imported.
+os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///" + os.path.join(
+    tempfile.mkdtemp(), "test.db"
+)
+os.environ.pop("REDIS_URL", None)
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+from app.schemas.database import engine  # noqa: E402
+from main import app  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(app) as c:
+        yield c
+
+
+@pytest.fixture(scope="session")
+def auth_headers(client):
+    user = dict(username="tester", email="tester@example.com", fname="T", lname="U", password="password123")
+    client.post("/auth/register", json=user)
+    r = client.post("/auth/login", data=dict(username=user["username"], password=user["password"]))
+    return {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+
+@pytest.fixture
+def count_statements():
+    """Return a callable that reports how many SQL statements `fn()` executed."""
+    def run(fn):
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(engine.sync_engine, "before_cursor_execute", record)
+        try:
+            result = fn()
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", record)
+        return len(statements), result
+
+    return run
@@ -0,0 +1,77 @@
+"""Statement counts for the hot read paths and collection delete.
+
+Each test compares a small and a larger data set, so a lazy load that slips
+back in (one SELECT per row or per tag) fails here instead of in production.
+"""
+from itertools import count
+
+_titles = count()
+
+
+def _create(client, headers, path, **body):
+    body.setdefault("title", f"item {next(_titles)}")
+    r = client.post(path, headers=headers, json=body)
+    assert r.status_code == 201, r.text
+    return r.json()
+
+
+def _tags(client, headers, n):
+    return [_create(client, headers, "/tags/")["id"] for _ in range(n)]
+
+
+def _collection_with_items(client, headers, n, tag_ids):
+    collection = _create(client, headers, "/collections/", type="mixed", tag_ids=tag_ids)
+    for _ in range(n):
+        _create(client, headers, "/tasks/", collection_id=collection["id"], tag_ids=tag_ids)
+        _create(client, headers, "/notes/", collection_id=collection["id"], tag_ids=tag_ids)
+    return collection["id"]
+
+
+def test_task_list_does_not_grow_with_rows(client, auth_headers, count_statements):
+    tag_ids = _tags(client, auth_headers, 3)
+    _create(client, auth_headers, "/tasks/", tag_ids=tag_ids)
+
+    def list_tasks():
+        r = client.get("/tasks/", headers=auth_headers)
+        assert r.status_code == 200, r.text
+        return len(r.json())
+
+    few, rows_before = count_statements(list_tasks)
+    for _ in range(5):
+        _create(client, auth_headers, "/tasks/", tag_ids=tag_ids)
+    many, rows_after = count_statements(list_tasks)
+
+    assert rows_after == rows_before + 5
+    # User lookup, then one page query with tag ids aggregated per row
+    assert few == many == 2
+
+
+def test_task_detail_loads_tags_in_one_query(client, auth_headers, count_statements):
+    task = _create(client, auth_headers, "/tasks/", tag_ids=_tags(client, auth_headers, 3))
+
+    def get_task():
+        r = client.get(f"/tasks/{task['id']}", headers=auth_headers)
+        assert r.status_code == 200, r.text
+        return r.json()
+
+    n, body = count_statements(get_task)
+    assert sorted(body["tag_ids"]) == sorted(task["tag_ids"])
+    # User lookup, the task, and its tags in one owner-scoped SELECT
+    assert n == 3
+
+
+def test_collection_delete_does_not_grow_with_items(client, auth_headers, count_statements):
+    tag_ids = _tags(client, auth_headers, 2)
+    small = _collection_with_items(client, auth_headers, 1, tag_ids)
+    large = _collection_with_items(client, auth_headers, 5, tag_ids)
+
+    def delete(collection_id):
+        r = client.delete(f"/collections/{collection_id}", headers=auth_headers)
+        assert r.status_code == 204, r.text
+
+    few, _ = count_statements(lambda: delete(small))
+    many, _ = count_statements(lambda: delete(large))
+    # User lookup, then one bulk DELETE each for task links, tasks, note links,
+    # notes, collection links and the collection itself
+    assert few == many == 7
+    assert client.get(f"/collections/{large}", headers=auth_headers).status_code == 404